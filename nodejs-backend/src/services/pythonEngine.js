@@ -1,4 +1,5 @@
 const axios = require('axios');
+const { PythonEngineRpcClient } = require('./pythonEngineRpc');
 
 class PythonEngineService {
   constructor() {
@@ -10,6 +11,9 @@ class PythonEngineService {
         'Content-Type': 'application/json'
       }
     });
+    // Optional Unix socket RPC for a co-located engine (python src/rpc_server.py)
+    this.socketPath = process.env.PYTHON_ENGINE_SOCKET;
+    this.rpc = this.socketPath ? new PythonEngineRpcClient(this.socketPath, 10000) : null;
   }
 
   async healthCheck() {
@@ -25,6 +29,11 @@ class PythonEngineService {
   async makeMove(board, currentPlayer) {
     try {
       console.log('Making move request to Python engine:', { board, currentPlayer });
+      if (this.rpc) {
+        const result = await this.rpc.makeMove(board, currentPlayer);
+        console.log('Python engine response:', result);
+        return result;
+      }
       const response = await this.client.post('/make-move', {
         board: board,
         current_player: currentPlayer
@@ -0,0 +1,167 @@
+const net = require('net');
+
+// Wire format shared with python-engine/src/rpc_server.py (big-endian)
+// Request frame:  u32 length=8, u32 id, u16 state code, u8 player, u8 difficulty
+// Response frame: u32 length=12, u32 id, u8 status, i8 row, i8 col, u8 flags,
+//                 i8 winner, u8 reserved, u16 state code after the move
+const REQUEST_FRAME_SIZE = 12;
+const RESPONSE_PAYLOAD_SIZE = 12;
+
+const STATUS_OK = 0;
+const FLAG_GAME_OVER = 1;
+const FLAG_DRAW = 2;
+
+const PLAYERS = { x: 0, o: 1 };
+const DIFFICULTIES = { easy: 0, medium: 1, hard: 2 };
+const CELL_DIGITS = { 0: 0, '-1': 1, 1: 2 };
+const DIGIT_CELLS = [0, -1, 1];
+
+class PythonEngineRpcClient {
+  constructor(socketPath, timeout = 10000) {
+    this.socketPath = socketPath;
+    this.timeout = timeout;
+    this.socket = null;
+    this.connecting = null;
+    this.buffer = Buffer.alloc(0);
+    this.pending = new Map();
+    this.nextId = 1;
+  }
+
+  connect() {
+    if (this.socket) return Promise.resolve(this.socket);
+    if (this.connecting) return this.connecting;
+
+    this.connecting = new Promise((resolve, reject) => {
+      const socket = net.createConnection(this.socketPath);
+      socket.once('connect', () => {
+        this.socket = socket;
+        this.connecting = null;
+        resolve(socket);
+      });
+      socket.on('data', (chunk) => this.onData(chunk));
+      socket.on('error', (error) => {
+        this.connecting = null;
+        this.failPending(error);
+        reject(error);
+      });
+      socket.on('close', () => {
+        this.socket = null;
+        this.buffer = Buffer.alloc(0);
+        this.failPending(new Error('Python engine socket closed'));
+      });
+    });
+    return this.connecting;
+  }
+
+  close() {
+    if (this.socket) {
+      this.socket.end();
+      this.socket = null;
+    }
+  }
+
+  onData(chunk) {
+    this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk;
+    let offset = 0;
+    while (this.buffer.length - offset >= 4) {
+      const length = this.buffer.readUInt32BE(offset);
+      if (this.buffer.length - offset < 4 + length) break;
+      if (length === RESPONSE_PAYLOAD_SIZE) {
+        this.onResponse(this.buffer, offset + 4);
+      }
+      offset += 4 + length;
+    }
+    this.buffer = this.buffer.subarray(offset);
+  }
+
+  onResponse(buffer, offset) {
+    const id = buffer.readUInt32BE(offset);
+    const request = this.pending.get(id);
+    if (!request) return;
+    this.pending.delete(id);
+    clearTimeout(request.timer);
+
+    const status = buffer.readUInt8(offset + 4);
+    if (status !== STATUS_OK) {
+      request.reject(new Error(`Python engine rejected the request (status ${status})`));
+      return;
+    }
+    const flags = buffer.readUInt8(offset + 7);
+    const winner = buffer.readInt8(offset + 8);
+    request.resolve({
+      position: [buffer.readInt8(offset + 5), buffer.readInt8(offset + 6)],
+      board: decodeState(buffer.readUInt16BE(offset + 10)),
+      game_over: (flags & FLAG_GAME_OVER) !== 0,
+      winner: winner === -1 ? 'x' : winner === 1 ? 'o' : null,
+      is_draw: (flags & FLAG_DRAW) !== 0
+    });
+  }
+
+  failPending(error) {
+    for (const request of this.pending.values()) {
+      clearTimeout(request.timer);
+      request.reject(error);
+    }
+    this.pending.clear();
+  }
+
+  // Same result shape as POST /make-move on the HTTP engine
+  async makeMove(board, currentPlayer, difficulty = 'medium') {
+    const player = PLAYERS[currentPlayer];
+    const level = DIFFICULTIES[difficulty];
+    if (player === undefined || level === undefined) {
+      throw new Error('Invalid player or difficulty');
+    }
+    const stateCode = encodeBoard(board);
+    const socket = await this.connect();
+
+    const id = this.nextId;
+    this.nextId = this.nextId >= 0xffffffff ? 1 : this.nextId + 1;
+
+    const frame = Buffer.alloc(REQUEST_FRAME_SIZE);
+    frame.writeUInt32BE(REQUEST_FRAME_SIZE - 4, 0);
+    frame.writeUInt32BE(id, 4);
+    frame.writeUInt16BE(stateCode, 8);
+    frame.writeUInt8(player, 10);
+    frame.writeUInt8(level, 11);
+
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error('Python engine request timed out'));
+      }, this.timeout);
+      this.pending.set(id, { resolve, reject, timer });
+      socket.write(frame);
+    });
+  }
+}
+
+// Base-3 state code, same indexing as the engine's Environment.get_state
+function encodeBoard(board) {
+  let code = 0;
+  let power = 1;
+  for (const row of board) {
+    for (const cell of row) {
+      const digit = CELL_DIGITS[cell];
+      if (digit === undefined) throw new Error(`Invalid cell value: ${cell}`);
+      code += digit * power;
+      power *= 3;
+    }
+  }
+  return code;
+}
+
+function decodeState(code) {
+  const board = [];
+  for (let i = 0; i < 3; i++) {
+    const row = [];
+    for (let j = 0; j < 3; j++) {
+      row.push(DIGIT_CELLS[code % 3]);
+      code = Math.floor(code / 3);
+    }
+    board.push(row);
+  }
+  return board;
+}
+
+module.exports = { PythonEngineRpcClient, encodeBoard, decodeState };
@@ -0,0 +1,82 @@
+const fs = require('fs');
+const net = require('net');
+const os = require('os');
+const path = require('path');
+const { PythonEngineRpcClient, encodeBoard, decodeState } = require('../src/services/pythonEngineRpc');
+
+describe('Python Engine RPC Client', () => {
+  let server;
+  let socketPath;
+  let client;
+
+  beforeEach((done) => {
+    socketPath = path.join(os.tmpdir(), `engine-rpc-${process.pid}-${Date.now()}.sock`);
+    // Fake engine: answers every request with move (0, 2) on a won board, in reverse order
+    server = net.createServer((socket) => {
+      socket.on('data', (data) => {
+        const frames = [];
+        for (let offset = 0; offset < data.length; offset += 12) {
+          const id = data.readUInt32BE(offset + 4);
+          const response = Buffer.alloc(16);
+          response.writeUInt32BE(12, 0);
+          response.writeUInt32BE(id, 4);
+          response.writeUInt8(data.readUInt8(offset + 11) === 2 ? 1 : 0, 8);
+          response.writeInt8(0, 9);
+          response.writeInt8(2, 10);
+          response.writeUInt8(1, 11);
+          response.writeInt8(-1, 12);
+          response.writeUInt16BE(encodeBoard([[-1, -1, -1], [1, 1, 0], [0, 0, 0]]), 14);
+          frames.push(response);
+        }
+        socket.write(Buffer.concat(frames.reverse()));
+      });
+    });
+    server.listen(socketPath, done);
+    client = new PythonEngineRpcClient(socketPath, 1000);
+  });
+
+  afterEach((done) => {
+    client.close();
+    server.close(() => {
+      if (fs.existsSync(socketPath)) fs.unlinkSync(socketPath);
+      done();
+    });
+  });
+
+  it('should encode boards like the engine state code', () => {
+    expect(encodeBoard([[0, 0, 0], [0, 0, 0], [0, 0, 0]])).toBe(0);
+    expect(encodeBoard([[-1, 0, 0], [0, 0, 0], [0, 0, 0]])).toBe(1);
+    expect(encodeBoard([[1, 0, 0], [0, 0, 0], [0, 0, 0]])).toBe(2);
+    expect(encodeBoard([[0, -1, 0], [0, 0, 0], [0, 0, 0]])).toBe(3);
+    const board = [[-1, 1, 0], [0, -1, 1], [1, 0, -1]];
+    expect(decodeState(encodeBoard(board))).toEqual(board);
+  });
+
+  it('should resolve pipelined requests by request id', async () => {
+    const board = [[-1, -1, 0], [1, 1, 0], [0, 0, 0]];
+    const results = await Promise.all([
+      client.makeMove(board, 'x'),
+      client.makeMove(board, 'x'),
+      client.makeMove(board, 'x', 'easy')
+    ]);
+    expect(results[0]).toEqual({
+      position: [0, 2],
+      board: [[-1, -1, -1], [1, 1, 0], [0, 0, 0]],
+      game_over: true,
+      winner: 'x',
+      is_draw: false
+    });
+    expect(results[1]).toEqual(results[0]);
+    expect(results[2]).toEqual(results[0]);
+  });
+
+  it('should reject requests the engine refuses', async () => {
+    // The fake engine refuses hard difficulty requests
+    const board = [[-1, -1, 0], [1, 1, 0], [0, 0, 0]];
+    await expect(client.makeMove(board, 'x', 'hard')).rejects.toThrow('rejected');
+  });
+
+  it('should reject invalid players before sending', async () => {
+    await expect(client.makeMove([[0, 0, 0], [0, 0, 0], [0, 0, 0]], 'z')).rejects.toThrow('Invalid');
+  });
+});
@@ -0,0 +1,76 @@
+"""
+Benchmark the /make-move request pipeline, excluding the search.
+
+Requests are driven straight through the ASGI app, without an HTTP
+client, and the difficulty roll is pinned to a random move, so the
+numbers are dominated by parsing, validation, status checks and
+response serialization.
+
+Usage:
+    python benchmarks/make_move_pipeline.py [requests]
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api import app
+
+BODY = json.dumps({
+    "board": [[-1, 0, 0], [0, 1, 0], [0, 0, 0]],
+    "current_player": "x",
+    "difficulty": "medium"
+}).encode()
+
+SCOPE = {
+    'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+    'method': 'POST', 'scheme': 'http', 'path': '/make-move', 'raw_path': b'/make-move',
+    'root_path': '', 'query_string': b'', 'server': ('bench', 80), 'client': ('bench', 1),
+    'headers': [(b'content-type', b'application/json'),
+                (b'content-length', str(len(BODY)).encode())],
+}
+
+
+async def request():
+    async def receive():
+        return {'type': 'http.request', 'body': BODY, 'more_body': False}
+
+    status = []
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await app(dict(SCOPE), receive, send)
+    assert status == [200], status
+
+
+async def main(n):
+    random.random = lambda: 0.99  # Always take the random move, never search
+    for _ in range(200):
+        await request()
+
+    start = time.process_time()
+    for _ in range(n):
+        await request()
+    cpu_us = (time.process_time() - start) / n * 1e6
+
+    tracemalloc.start()
+    peak = 0
+    for _ in range(200):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        await request()
+        peak += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+
+    print(f"CPU per request:     {cpu_us:8.1f} us")
+    print(f"Peak allocation:     {peak / 200 / 1024:8.1f} KiB per request")
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,150 @@
+"""
+Benchmark the pattern evaluator and measure playing strength on larger boards.
+
+Leaf throughput compares the old per-line Python loop with single-board
+table lookups and batched NumPy evaluation. Strength plays fixed-depth searches with the
+default weights, weights fitted to random self-play, and a random mover
+against each other on 4x4 and 5x5, swapping colours every game.
+
+Usage:
+    python benchmarks/pattern_evaluator.py [games] [self_play_games]
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from evaluator import PatternEvaluator
+from smart_engine import SmartTicTacToeAI
+
+SEARCH_DEPTH = {3: 4, 4: 2, 5: 2}
+
+
+def legacy_evaluate(ai, board, player_int, opponent_int):
+    """The line loop that _evaluate_position used before the pattern evaluator."""
+    score = 0
+    for combo in ai.winning_combinations:
+        values = [board[pos[0]][pos[1]] for pos in combo]
+        player_count = values.count(player_int)
+        opponent_count = values.count(opponent_int)
+        if opponent_count == 0 and 0 < player_count < ai.board_size:
+            score += 5 ** (player_count - 1)
+        if player_count == 0 and 0 < opponent_count < ai.board_size:
+            score -= 5 ** (opponent_count - 1)
+    return score
+
+
+def random_boards(size, count, rng):
+    boards = np.zeros((count, size * size), dtype=np.int8)
+    for board in boards:
+        pieces = rng.randrange(size * size)
+        cells = rng.sample(range(size * size), pieces)
+        for index, cell in enumerate(cells):
+            board[cell] = -1 if index % 2 == 0 else 1
+    return boards
+
+
+def leaf_throughput(size, count=20000):
+    rng = random.Random(0)
+    boards = random_boards(size, count, rng)
+    rows = [board.reshape(size, size).tolist() for board in boards]
+    ai = SmartTicTacToeAI(board_size=size)
+    evaluator = ai.evaluator
+
+    start = time.perf_counter()
+    legacy = [legacy_evaluate(ai, board, -1, 1) for board in rows]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [evaluator.evaluate(board, -1) for board in rows]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = evaluator.evaluate_batch(boards, -1)
+    batch_time = time.perf_counter() - start
+
+    assert legacy == single == batch.tolist()
+    for name, elapsed in (("python loop", legacy_time), ("table single", single_time),
+                          ("numpy batch", batch_time)):
+        print(f"  {name:<14} {count / elapsed:>12.0f} leaves/s")
+
+
+def play_game(size, players, rng):
+    """Play one game; players are (ai or None for random) for X then O."""
+    board = [[0] * size for _ in range(size)]
+    checker = SmartTicTacToeAI(board_size=size)
+    player_int = -1
+    history = []
+    for ply in range(size * size):
+        ai = players[ply % 2]
+        moves = checker._get_available_moves(board)
+        if ai is None:
+            move = rng.choice(moves)
+        else:
+            move = ai._get_optimal_move(board, player_int, -player_int, SEARCH_DEPTH[size])
+        board[move[0]][move[1]] = player_int
+        history.append((np.array(board, dtype=np.int8).ravel(), player_int))
+        result = checker._check_winner(board)
+        if result is not None:
+            return result, history
+        player_int = -player_int
+    return 0, history
+
+
+def self_play_fit(size, games, rng):
+    """Fit weights to the outcomes of random self-play games."""
+    boards, players, outcomes = [], [], []
+    for _ in range(games):
+        result, history = play_game(size, (None, None), rng)
+        for board, player_int in history:
+            # Score each position for the side that just moved
+            boards.append(board)
+            players.append(player_int)
+            outcomes.append(result * player_int)
+    return PatternEvaluator.fit(size, np.array(boards), np.array(players), np.array(outcomes))
+
+
+def match(size, first, second, games, rng):
+    """Return (wins, draws, losses) for ``first``, alternating colours."""
+    tally = [0, 0, 0]
+    for game in range(games):
+        players = (first, second) if game % 2 == 0 else (second, first)
+        result, _ = play_game(size, players, rng)
+        first_int = -1 if game % 2 == 0 else 1
+        tally[0 if result == first_int else 1 if result == 0 else 2] += 1
+    return tuple(tally)
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    self_play_games = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(0)
+
+    for size in (3, 4, 5):
+        print(f"{size}x{size} leaf evaluation")
+        leaf_throughput(size)
+
+    for size in (4, 5):
+        start = time.perf_counter()
+        fitted = self_play_fit(size, self_play_games, rng)
+        print(f"{size}x{size} fitted weights ({self_play_games} self-play games, "
+              f"{time.perf_counter() - start:.1f}s):")
+        print(np.array2string(fitted.weights, precision=3))
+
+        default_ai = SmartTicTacToeAI(board_size=size)
+        fitted_ai = SmartTicTacToeAI(board_size=size, evaluator=fitted)
+        for name, first, second in (("default vs random", default_ai, None),
+                                    ("fitted vs random", fitted_ai, None),
+                                    ("fitted vs default", fitted_ai, default_ai)):
+            start = time.perf_counter()
+            wins, draws, losses = match(size, first, second, games, rng)
+            print(f"  {name:<18} W/D/L {wins:>3}/{draws:>3}/{losses:>3} "
+                  f"({time.perf_counter() - start:.1f}s, depth {SEARCH_DEPTH[size]})")
+
+
+if __name__ == "__main__":
+    main()
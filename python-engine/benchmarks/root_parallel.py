@@ -0,0 +1,55 @@
+"""
+Benchmark root-parallel search against serial search.
+
+Usage:
+    python benchmarks/root_parallel.py [max_workers]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from smart_engine import SmartTicTacToeAI, shutdown_root_pool
+
+# (board, player_int) pairs, from the most to the least expensive
+POSITIONS = [
+    ([[0, 0, 0], [0, 0, 0], [0, 0, 0]], -1),
+    ([[0, 0, 0], [0, -1, 0], [0, 0, 0]], 1),
+    ([[-1, 0, 0], [0, 0, 0], [0, 0, 0]], 1),
+    ([[-1, 0, 0], [0, 1, 0], [0, 0, 0]], -1),
+]
+REPEATS = 3
+
+
+def time_search(ai, workers):
+    """Return (moves, best wall time in seconds) over all positions."""
+    best = float('inf')
+    moves = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        moves = [ai._get_optimal_move(board, player, -player, 9, workers=workers)
+                 for board, player in POSITIONS]
+        best = min(best, time.perf_counter() - start)
+    return moves, best
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    ai = SmartTicTacToeAI(difficulty='hard')
+    serial_moves, serial_time = time_search(ai, 1)
+    print(f"{'workers':>7} {'time (s)':>10} {'speedup':>8}")
+    print(f"{1:>7} {serial_time:>10.3f} {1.0:>8.2f}")
+    try:
+        for workers in range(2, max_workers + 1):
+            # Warm up the pool so process start-up is not timed
+            time_search(ai, workers)
+            moves, elapsed = time_search(ai, workers)
+            assert moves == serial_moves, "parallel search diverged from serial search"
+            print(f"{workers:>7} {elapsed:>10.3f} {serial_time / elapsed:>8.2f}")
+    finally:
+        shutdown_root_pool()
+
+
+if __name__ == "__main__":
+    main()
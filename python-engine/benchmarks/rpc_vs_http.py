@@ -0,0 +1,110 @@
+"""
+Benchmark /make-move over localhost HTTP against the Unix socket RPC server.
+
+Both servers are started as subprocesses. The position has an immediate
+win, so the engine work is tiny and the numbers show protocol overhead.
+
+Usage:
+    python benchmarks/rpc_vs_http.py [requests] [rpc_workers]
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.append(SRC)
+
+from rpc_server import LENGTH, REQUEST, RESPONSE_FRAME, STATUS_OK
+from state_table import encode_board
+
+BOARD = [[-1, -1, 0], [1, 1, 0], [0, 0, 0]]
+HTTP_PORT = 8765
+
+
+def wait_for(check, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if check():
+                return
+        except (OSError, httpx.HTTPError):
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def bench_http(n):
+    body = {"board": BOARD, "current_player": "x"}
+    with httpx.Client(base_url=f"http://127.0.0.1:{HTTP_PORT}") as client:
+        for _ in range(100):
+            client.post("/make-move", json=body)
+        start = time.perf_counter()
+        for _ in range(n):
+            assert client.post("/make-move", json=body).status_code == 200
+        return time.perf_counter() - start
+
+
+def recv_exactly(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("socket closed")
+        data += chunk
+    return data
+
+
+def bench_rpc(path, n, pipelined):
+    state_code = encode_board(BOARD)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        frames = [LENGTH.pack(REQUEST.size) + REQUEST.pack(i, state_code, 0, 1) for i in range(n)]
+        start = time.perf_counter()
+        if pipelined:
+            sock.sendall(b''.join(frames))
+            data = recv_exactly(sock, RESPONSE_FRAME.size * n)
+            responses = [RESPONSE_FRAME.unpack_from(data, i * RESPONSE_FRAME.size) for i in range(n)]
+        else:
+            responses = []
+            for frame in frames:
+                sock.sendall(frame)
+                responses.append(RESPONSE_FRAME.unpack(recv_exactly(sock, RESPONSE_FRAME.size)))
+        elapsed = time.perf_counter() - start
+    assert all(response[2] == STATUS_OK for response in responses)
+    return elapsed
+
+
+def report(name, n, elapsed):
+    print(f"{name:<24} {n / elapsed:>10.0f} req/s {elapsed / n * 1e6:>10.1f} us/req")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    workers = sys.argv[2] if len(sys.argv) > 2 else '0'
+    path = os.path.join(tempfile.mkdtemp(), 'engine.sock')
+
+    http_server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api:app', '--app-dir', SRC,
+         '--port', str(HTTP_PORT), '--log-level', 'warning'])
+    rpc_server = subprocess.Popen(
+        [sys.executable, os.path.join(SRC, 'rpc_server.py'), '--socket', path, '--workers', workers])
+    try:
+        wait_for(lambda: httpx.get(f"http://127.0.0.1:{HTTP_PORT}/health").status_code == 200)
+        wait_for(lambda: os.path.exists(path))
+        report("HTTP keep-alive", n, bench_http(n))
+        report("RPC round trip", n, bench_rpc(path, n, pipelined=False))
+        report("RPC pipelined", n, bench_rpc(path, n, pipelined=True))
+    finally:
+        http_server.terminate()
+        rpc_server.terminate()
+        http_server.wait()
+        rpc_server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Tuple
 import numpy as np
@@ -8,8 +9,18 @@ import sys
 
 # Add the current directory to Python path to import engine
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from engine import Environment, AgentEval
 from smart_engine import smart_ai
+from single_flight import SingleFlight
+from state_table import encode_board, is_legal, can_move, CELL_TO_DIGIT, POWERS
+from state_table import game_status as lookup_status
+from tablebase import Tablebase, DEFAULT_PATH as TABLEBASE_DEFAULT_PATH
+
+# orjson is optional; fall back to the standard JSON response without it
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    FastJSONResponse = JSONResponse
 
 app = FastAPI(title="Tic-Tac-Toe Engine API", version="1.0.0")
 
@@ -18,6 +29,26 @@ class GameState(BaseModel):
     current_player: str  # 'x' or 'o'
     game_id: Optional[str] = None
     difficulty: Optional[str] = 'medium'  # 'easy', 'medium', 'hard'
+    include_replies: bool = False  # Add the engine's reply to every opponent move
+    max_ms: Optional[float] = None  # Wall-clock budget for the search, anytime when set
+
+class SearchStats(BaseModel):
+    nodes: int
+    node_limit: Optional[int] = None
+    depth_reached: int
+    depth_limit: int
+    elapsed_ms: float
+    time_limit_ms: Optional[float] = None
+    budget_exhausted: Optional[str] = None  # 'nodes' or 'time'
+    completed: bool = True  # Search finished within its budgets
+    depth_completed: int = 0  # Deepest search depth finished in full
+
+class ReplyEntry(BaseModel):
+    move: Tuple[int, int]  # Opponent move from the returned board
+    reply: Tuple[int, int]  # Engine's answer, (-1, -1) if the opponent's move ends the game
+    game_over: bool  # Status after the reply
+    winner: Optional[str] = None
+    is_draw: bool = False
 
 class MoveResponse(BaseModel):
     position: Tuple[int, int]
@@ -25,6 +56,8 @@ class MoveResponse(BaseModel):
     game_over: bool
     winner: Optional[str] = None
     is_draw: bool = False
+    search: Optional[SearchStats] = None  # Set when the move came from minimax search
+    replies: Optional[List[ReplyEntry]] = None  # Set when include_replies was requested without max_ms
 
 class GameStatusResponse(BaseModel):
     board: List[List[int]]
@@ -33,6 +66,27 @@ class GameStatusResponse(BaseModel):
     is_draw: bool = False
     current_player: str
 
+class GameRecord(BaseModel):
+    moves: List[Tuple[int, int]]  # (row, col) in the order they were played
+    first_player: str = 'x'  # 'x' or 'o'
+
+class MoveAnalysis(BaseModel):
+    ply: int
+    player: str
+    position: Tuple[int, int]
+    score: int  # Value of the played move for the mover: >0 win, 0 draw, <0 loss
+    best_move: Tuple[int, int]
+    best_score: int
+    blunder: bool  # Played move drops the best achievable result
+
+class GameAnalysisResponse(BaseModel):
+    moves: List[MoveAnalysis]
+    board: List[List[int]]
+    game_over: bool
+    winner: Optional[str] = None
+    is_draw: bool = False
+    positions_searched: int
+
 # Global variables for the engine
 VX_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'vx.npy')
 VO_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'vo.npy')
@@ -44,20 +98,157 @@ try:
 except FileNotFoundError:
     print("Warning: Value function files not found. Using smart AI engine only.")
 
+# Optional 4x4 tablebase, built with src/tablebase.py
+TABLEBASE_PATH = os.environ.get('TABLEBASE_PATH', TABLEBASE_DEFAULT_PATH)
+try:
+    tablebase_4x4 = Tablebase(TABLEBASE_PATH)
+except FileNotFoundError:
+    tablebase_4x4 = None
+
 # Global smart AI instance with medium difficulty
 smart_ai = smart_ai
 
-def get_next_action(env: Environment, symbol: str, difficulty: str = 'medium') -> Tuple[int, int]:
-    """Get the next best move for the given player."""
+# Identical concurrent searches share one computation
+search_flights = SingleFlight()
+
+def run_search(ai, board: List[List[int]], player_int: int, max_depth: int,
+               max_ms: Optional[float] = None) -> Tuple[Tuple[int, int], Optional[dict]]:
+    """Run a minimax search and return the move with its budget usage."""
+    if max_ms is None:
+        move = ai._get_optimal_move(board, player_int, -player_int, max_depth)
+    else:
+        move = ai._search_iterative(board, player_int, -player_int, max_depth, max_ms)[0]
+    return move, ai.last_search_stats
+
+async def get_next_action(board: List[List[int]], state_code: int, symbol: str,
+                          difficulty: str = 'medium',
+                          max_ms: Optional[float] = None) -> Tuple[Tuple[int, int], Optional[dict]]:
+    """
+    Get the next best move for the given player.
+    
+    The minimax search runs off the event loop and is shared by concurrent
+    requests for the same position, player, difficulty and time budget;
+    the difficulty roll stays per request. With ``max_ms`` the search
+    deepens iteratively and returns the best move found by the deadline.
+    ``board`` is searched in place and left as it was passed in.
+    
+    Returns:
+        Tuple of the move and the search stats (None if no search ran)
+    """
     # Create a new AI instance with the specified difficulty
     from smart_engine import SmartTicTacToeAI
     ai = SmartTicTacToeAI(difficulty=difficulty)
-    board = env.board.tolist()
-    return ai.make_move(board, symbol)
+    move = ai.plan_move(board, symbol, state_code)
+    if move is None:
+        player_int = -1 if symbol.lower() == 'x' else 1
+        max_depth = ai.difficulty_settings[difficulty]['max_depth']
+        key = (state_code, player_int, difficulty, max_ms)
+        return await search_flights.run(key, run_search, ai, board, player_int, max_depth, max_ms)
+    return move, None
+
+def reply_table(planned: List[Tuple[Tuple[int, int], Tuple[int, int]]], state_code: int,
+                symbol: str) -> List[dict]:
+    """Add the game status after each (opponent move, reply) pair."""
+    player_int = -1 if symbol.lower() == 'x' else 1
+    table = []
+    for move, reply in planned:
+        code = state_code + CELL_TO_DIGIT[-player_int] * POWERS[move[0] * 3 + move[1]]
+        if reply != (-1, -1):
+            code += CELL_TO_DIGIT[player_int] * POWERS[reply[0] * 3 + reply[1]]
+        status = lookup_status(code)
+        table.append({
+            'move': list(move),
+            'reply': list(reply),
+            'game_over': status['game_over'],
+            'winner': get_winner_symbol(status['winner']),
+            'is_draw': status['is_draw']
+        })
+    return table
+
+async def get_replies(board: List[List[int]], state_code: int, symbol: str,
+                      difficulty: str = 'medium') -> List[dict]:
+    """
+    Precompute the engine's reply to every opponent move from ``board``.
+    
+    Like get_next_action, the difficulty roll stays per request and only
+    the minimax replies run off the event loop, shared by concurrent
+    requests for the same position, player and difficulty.
+    """
+    from smart_engine import SmartTicTacToeAI
+    ai = SmartTicTacToeAI(difficulty=difficulty)
+    planned = ai.plan_replies(board, symbol, state_code)
+    if any(reply is None for _, reply in planned):
+        player_int = -1 if symbol.lower() == 'x' else 1
+        key = ('replies', state_code, player_int, difficulty)
+        searched = await search_flights.run(key, ai.search_replies, board, symbol, state_code)
+        planned = [(move, searched[move] if reply is None else reply) for move, reply in planned]
+    return reply_table(planned, state_code, symbol)
 
-def board_to_state(board: List[List[int]]) -> np.ndarray:
-    """Convert board list to numpy array."""
-    return np.array(board)
+def validate_board(board: List[List[int]]) -> int:
+    """
+    Validate a board and return its state code.
+
+    Raises:
+        HTTPException: 400 if the board is not a reachable 3x3 position
+    """
+    if len(board) != 3 or any(len(row) != 3 for row in board):
+        raise HTTPException(status_code=400, detail="Board must be 3x3")
+    try:
+        state_code = encode_board(board)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Board cells must be 0, -1 or 1")
+    if not is_legal(state_code):
+        raise HTTPException(status_code=400, detail="Board is not a reachable position")
+    return state_code
+
+def validate_turn(state_code: int, player: str):
+    """Reject a non-terminal board where it cannot be the given player's turn."""
+    player_int = -1 if player.lower() == 'x' else 1
+    if not lookup_status(state_code)['game_over'] and not can_move(state_code, player_int):
+        raise HTTPException(status_code=400, detail=f"It is not {player.lower()}'s turn")
+
+def tablebase_move(game_state: GameState) -> JSONResponse:
+    """
+    Play a 4x4 move from the tablebase: perfect play at every difficulty.
+
+    Raises:
+        HTTPException: 400 if the board or player is invalid, 500 if the
+                       loaded tablebase is not for 4x4 boards
+    """
+    if tablebase_4x4.board_size != 4:
+        size = tablebase_4x4.board_size
+        raise HTTPException(status_code=500,
+                            detail=f"Tablebase at {TABLEBASE_PATH} is for {size}x{size} boards, not 4x4")
+    board = game_state.board
+    if len(board) != 4 or any(len(row) != 4 for row in board):
+        raise HTTPException(status_code=400, detail="Board must be 4x4")
+    if any(cell not in (-1, 0, 1) for row in board for cell in row):
+        raise HTTPException(status_code=400, detail="Board cells must be 0, -1 or 1")
+    if not tablebase_4x4.is_legal(board):
+        raise HTTPException(status_code=400, detail="Board is not a reachable position")
+    player = game_state.current_player.lower()
+    if player not in ['x', 'o']:
+        raise HTTPException(status_code=400, detail="Current player must be 'x' or 'o'")
+    player_int = -1 if player == 'x' else 1
+    
+    game_status = tablebase_4x4.game_status(board)
+    next_move = (-1, -1)
+    if not game_status['game_over']:
+        if tablebase_4x4.value(board, player_int) is None:
+            raise HTTPException(status_code=400, detail=f"It is not {player}'s turn")
+        next_move = tablebase_4x4.best_move(board, player_int)
+        board[next_move[0]][next_move[1]] = player_int
+        game_status = tablebase_4x4.game_status(board)
+    
+    return FastJSONResponse({
+        'position': list(next_move),
+        'board': board,
+        'game_over': game_status['game_over'],
+        'winner': get_winner_symbol(game_status['winner']),
+        'is_draw': game_status['is_draw'],
+        'search': None,
+        'replies': None
+    })
 
 def get_winner_symbol(winner: int) -> Optional[str]:
     """Convert winner integer to symbol string."""
@@ -84,52 +275,71 @@ async def make_move(game_state: GameState):
         MoveResponse: Next move position and updated game state
     """
     try:
+        # 4x4 boards are answered from the tablebase when one is installed
+        if tablebase_4x4 is not None and len(game_state.board) == 4:
+            return tablebase_move(game_state)
+        
         # Validate input
-        if len(game_state.board) != 3 or any(len(row) != 3 for row in game_state.board):
-            raise HTTPException(status_code=400, detail="Board must be 3x3")
+        state_code = validate_board(game_state.board)
         
         if game_state.current_player.lower() not in ['x', 'o']:
             raise HTTPException(status_code=400, detail="Current player must be 'x' or 'o'")
         
-        # Create environment
-        env = Environment()
-        board_array = board_to_state(game_state.board)
-        env.set_state(board_array)
+        validate_turn(state_code, game_state.current_player)
         
-        # Check if game is already over using smart AI
-        game_status = smart_ai.check_game_state(game_state.board)
+        if game_state.max_ms is not None and game_state.max_ms < 0:
+            raise HTTPException(status_code=400, detail="max_ms must not be negative")
+        
+        # The parsed board is searched in place, updated with the move and
+        # serialized as is; status checks use the state code
+        board = game_state.board
+        
+        # Check if game is already over using the state table
+        game_status = lookup_status(state_code)
         if game_status['game_over']:
-            winner_symbol = get_winner_symbol(game_status['winner'])
-            return MoveResponse(
-                position=(-1, -1),  # Invalid position since game is over
-                board=game_state.board,
-                game_over=True,
-                winner=winner_symbol,
-                is_draw=game_status['is_draw']
-            )
+            return FastJSONResponse({
+                'position': [-1, -1],  # Invalid position since game is over
+                'board': board,
+                'game_over': True,
+                'winner': get_winner_symbol(game_status['winner']),
+                'is_draw': game_status['is_draw'],
+                'search': None,
+                'replies': None
+            })
         
         # Make the move using smart AI with difficulty
-        next_move = get_next_action(env, game_state.current_player, game_state.difficulty)
+        next_move, search_stats = await get_next_action(board, state_code, game_state.current_player,
+                                                        game_state.difficulty, game_state.max_ms)
         
-        # Update the board with the move
+        # Update the board and state code with the move
         if next_move != (-1, -1):  # Valid move
-            env.board[next_move[0]][next_move[1]] = -1 if game_state.current_player.lower() == 'x' else 1
+            player_int = -1 if game_state.current_player.lower() == 'x' else 1
+            board[next_move[0]][next_move[1]] = player_int
+            state_code += CELL_TO_DIGIT[player_int] * POWERS[next_move[0] * 3 + next_move[1]]
         
-        # Get updated board
-        updated_board = env.board.tolist()
+        # Check if game is over after the move using the state table
+        game_status = lookup_status(state_code)
         
-        # Check if game is over after the move using smart AI
-        game_status = smart_ai.check_game_state(updated_board)
-        winner_symbol = get_winner_symbol(game_status['winner'])
+        # Speculative answers to each opponent move, so clients can show
+        # them without another round trip. Skipped under a max_ms deadline,
+        # which the move search may already have used up
+        replies = None
+        if game_state.include_replies and game_state.max_ms is None and not game_status['game_over']:
+            replies = await get_replies(board, state_code, game_state.current_player, game_state.difficulty)
         
-        return MoveResponse(
-            position=next_move,
-            board=updated_board,
-            game_over=game_status['game_over'],
-            winner=winner_symbol,
-            is_draw=game_status['is_draw']
-        )
+        # Built directly, skipping response_model validation and encoding
+        return FastJSONResponse({
+            'position': list(next_move),
+            'board': board,
+            'game_over': game_status['game_over'],
+            'winner': get_winner_symbol(game_status['winner']),
+            'is_draw': game_status['is_draw'],
+            'search': search_stats,
+            'replies': replies
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error making move: {str(e)}")
 
@@ -146,16 +356,10 @@ async def check_game_state(game_state: GameState):
     """
     try:
         # Validate input
-        if len(game_state.board) != 3 or any(len(row) != 3 for row in game_state.board):
-            raise HTTPException(status_code=400, detail="Board must be 3x3")
+        state_code = validate_board(game_state.board)
         
-        # Create environment
-        env = Environment()
-        board_array = board_to_state(game_state.board)
-        env.set_state(board_array)
-        
-        # Check game state using smart AI
-        game_status = smart_ai.check_game_state(game_state.board)
+        # Check game state using the state table
+        game_status = lookup_status(state_code)
         winner_symbol = get_winner_symbol(game_status['winner'])
         
         return GameStatusResponse(
@@ -166,9 +370,41 @@ async def check_game_state(game_state: GameState):
             current_player=game_state.current_player
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error checking game state: {str(e)}")
 
+@app.post("/analyze-game", response_model=GameAnalysisResponse)
+async def analyze_game(game_record: GameRecord):
+    """
+    Evaluate every position of a finished or ongoing game.
+    
+    Args:
+        game_record: Moves played and the side that moved first
+        
+    Returns:
+        GameAnalysisResponse: Per-move score, best move and blunder flag
+    """
+    try:
+        if game_record.first_player.lower() not in ['x', 'o']:
+            raise HTTPException(status_code=400, detail="First player must be 'x' or 'o'")
+        
+        from smart_engine import SmartTicTacToeAI
+        ai = SmartTicTacToeAI(difficulty='hard')
+        try:
+            result = ai.analyze_game(game_record.moves, game_record.first_player)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        result['winner'] = get_winner_symbol(result['winner'])
+        return GameAnalysisResponse(**result)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing game: {str(e)}")
+
 @app.post("/reset-game")
 async def reset_game():
     """
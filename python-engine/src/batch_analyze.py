@@ -0,0 +1,164 @@
+"""
+Batch analysis of position dumps.
+
+Reads JSON lines of the form ``{"board": [[...]], "current_player": "x"}``
+and writes one JSON line per input, in input order, with the fields of
+``SmartTicTacToeAI.analyze_position`` added. Positions are deduplicated by
+state code and side to move, and new ones are evaluated in a process pool
+one batch at a time, so memory stays flat however large the input is.
+
+Usage:
+    python src/batch_analyze.py positions.jsonl -o results.jsonl [--workers N]
+"""
+import argparse
+import json
+import os
+import sys
+from multiprocessing import Pool
+from typing import IO, Iterable, Optional, Tuple
+
+# Add the current directory to Python path to import engine
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from smart_engine import SmartTicTacToeAI
+from state_table import encode_board, decode_state, is_legal, can_move
+
+DEFAULT_BATCH_SIZE = 10000
+
+WINNER_SYMBOLS = {-1: 'x', 1: 'o'}
+
+# Per-process analyzer, created by the pool initializer
+_worker_ai = None
+
+
+def _init_worker():
+    global _worker_ai
+    _worker_ai = SmartTicTacToeAI(difficulty='hard')
+
+
+def _analyze_key(key: Tuple[int, str]) -> dict:
+    """Evaluate one (state code, player) key."""
+    state_code, player = key
+    result = _worker_ai.analyze_position(decode_state(state_code), player)
+    result['winner'] = WINNER_SYMBOLS.get(result['winner'])
+    return result
+
+
+def parse_position(record: dict) -> Tuple[Tuple[int, str], Optional[str]]:
+    """
+    Validate an input record and build its cache key.
+
+    Returns:
+        Tuple of ((state code, player), None), or (None, error message)
+    """
+    board = record.get('board')
+    player = str(record.get('current_player', '')).lower()
+    if not isinstance(board, list) or len(board) != 3 or \
+            any(not isinstance(row, list) or len(row) != 3 for row in board):
+        return None, "Board must be 3x3"
+    if player not in ['x', 'o']:
+        return None, "Current player must be 'x' or 'o'"
+    try:
+        state_code = encode_board(board)
+    except (ValueError, TypeError):
+        return None, "Board cells must be 0, -1 or 1"
+    if not is_legal(state_code):
+        return None, "Board is not a reachable position"
+    player_int = -1 if player == 'x' else 1
+    status_only = not can_move(state_code, -1) and not can_move(state_code, 1)
+    if not status_only and not can_move(state_code, player_int):
+        return None, f"It is not {player}'s turn"
+    return (state_code, player), None
+
+
+def analyze_stream(lines: Iterable[str], out: IO[str], workers: int = 1,
+                   batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Analyze JSONL positions from ``lines`` and write results to ``out``.
+
+    Returns:
+        dict: Counts of positions read, searched and rejected
+    """
+    # Keys are limited to legal (state, player) pairs, so the cache is bounded
+    # by the table size rather than the input size
+    cache = {}
+    stats = {'positions': 0, 'searched': 0, 'errors': 0}
+    pool = Pool(workers, initializer=_init_worker) if workers > 1 else None
+    if pool is None:
+        _init_worker()
+
+    def flush(batch):
+        new_keys = list({key for _, _, key, _ in batch if key is not None and key not in cache})
+        if new_keys:
+            if pool is not None:
+                chunksize = max(1, len(new_keys) // (workers * 4))
+                results = pool.map(_analyze_key, new_keys, chunksize)
+            else:
+                results = [_analyze_key(key) for key in new_keys]
+            for key, result in zip(new_keys, results):
+                cache[key] = dict(result, state=key[0])
+            stats['searched'] += len(new_keys)
+        for line, record, key, error in batch:
+            if error is not None:
+                record['error'] = error
+                stats['errors'] += 1
+                out.write(json.dumps(record, separators=(',', ':')) + '\n')
+            else:
+                # Analysis fields replace input fields of the same name
+                record.update(cache[key])
+                out.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+    try:
+        batch = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            stats['positions'] += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                batch.append((line, {'raw': line}, None, "Invalid JSON"))
+            else:
+                if isinstance(record, dict):
+                    key, error = parse_position(record)
+                    batch.append((line, record, key, error))
+                else:
+                    batch.append((line, {'raw': line}, None, "Expected a JSON object"))
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return stats
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Analyze a JSONL dump of Tic-Tac-Toe positions.")
+    parser.add_argument('input', help="input JSONL file, or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="output JSONL file, or - for stdout")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes for new positions")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help="input lines buffered per batch")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        stats = analyze_stream(source, sink, args.workers, args.batch_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    print(f"{stats['positions']} positions, {stats['searched']} searched, "
+          f"{stats['errors']} rejected", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Exhaustive differential testing of engine implementations.
+
+The corpus lists every position reachable in play, with either side
+starting, and for each side that can be to move there:
+``{"state", "player", "game_over", "winner", "is_draw", "value", "best_moves"}``.
+Reachability and status come from the original line checks of
+SmartTicTacToeAI, not the state table, and value and best moves from the
+exact solver. ``value`` is on the full-depth minimax scale and
+``best_moves`` keeps the order of _get_available_moves, so its first
+entry is the move _get_optimal_move picks. Terminal positions are listed
+once, with ``player``, ``value`` and ``best_moves`` set to null.
+
+The harness runs a move function and a status function over the corpus
+and reports every mismatch and the throughput of each.
+
+Usage:
+    python src/differential.py generate -o corpus.jsonl
+    python src/differential.py check [--corpus corpus.jsonl] [--engine NAME] [--strict]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, IO, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Add the current directory to Python path to import engine
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from engine import Environment
+from smart_engine import SmartTicTacToeAI, shutdown_root_pool
+from state_table import encode_board, decode_state
+
+PLAYER_SYMBOLS = {-1: 'x', 1: 'o'}
+PLAYER_INTS = {'x': -1, 'o': 1}
+
+# Mismatch details kept in a report, the counts are always exact
+MAX_REPORTED = 20
+
+MoveFn = Callable[[List[List[int]], int], Tuple[int, int]]
+StatusFn = Callable[[List[List[int]]], dict]
+
+
+def build_corpus() -> List[dict]:
+    """Enumerate and solve every reachable position, sorted by state code and player."""
+    ai = SmartTicTacToeAI(difficulty='hard')
+    env = Environment()
+    cache = {}
+    records = {}
+
+    def visit(board: List[List[int]], player_int: int):
+        code = encode_board(board)
+        winner = ai._check_winner(board)
+        if winner is not None or ai._is_board_full(board):
+            key = (code, None)
+            if key not in records:
+                records[key] = {'state': code, 'player': None, 'game_over': True,
+                                'winner': PLAYER_SYMBOLS.get(winner),
+                                'is_draw': winner is None, 'value': None, 'best_moves': None}
+            return
+        key = (code, player_int)
+        if key in records:
+            return
+        env.board = np.array(board)
+        scored = ai._score_moves(env, player_int, cache)
+        value = max(score for _, score in scored)
+        records[key] = {'state': code, 'player': PLAYER_SYMBOLS[player_int], 'game_over': False,
+                        'winner': None, 'is_draw': False, 'value': value,
+                        'best_moves': [list(move) for move, score in scored if score == value]}
+        for i, j in ai._get_available_moves(board):
+            board[i][j] = player_int
+            visit(board, -player_int)
+            board[i][j] = 0
+
+    for first in (-1, 1):
+        visit([[0] * 3 for _ in range(3)], first)
+    return [records[key] for key in sorted(records, key=lambda key: (key[0], key[1] or 0))]
+
+
+def write_corpus(records: Iterable[dict], out: IO[str]):
+    for record in records:
+        out.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+def load_corpus(lines: Iterable[str]) -> List[dict]:
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def run_differential(corpus: List[dict], move_fn: Optional[MoveFn] = None,
+                     status_fn: Optional[StatusFn] = None, strict: bool = False) -> dict:
+    """
+    Compare an engine against the corpus.
+
+    Args:
+        corpus: Records from build_corpus or load_corpus
+        move_fn: Called as move_fn(board, player_int) on every non-terminal
+                 position; gets its own copy of the board
+        status_fn: Called as status_fn(board) on every position and compared
+                   on game_over, winner and is_draw
+        strict: Require the move _get_optimal_move picks, not just any optimal one
+
+    Returns:
+        dict: Position counts, mismatch counts, up to MAX_REPORTED mismatch
+              details and the throughput of each function in calls per second
+    """
+    report = {'positions': len(corpus), 'moves_checked': 0, 'move_mismatches': 0,
+              'statuses_checked': 0, 'status_mismatches': 0, 'mismatches': []}
+    boards = [decode_state(record['state']) for record in corpus]
+
+    def mismatch(record, kind, expected, actual):
+        if len(report['mismatches']) < MAX_REPORTED:
+            report['mismatches'].append({'state': record['state'], 'player': record['player'],
+                                         'kind': kind, 'expected': expected, 'actual': actual})
+
+    if move_fn is not None:
+        searched = [(record, board) for record, board in zip(corpus, boards) if not record['game_over']]
+        elapsed = 0.0
+        for record, board in searched:
+            start = time.perf_counter()
+            move = move_fn([row[:] for row in board], PLAYER_INTS[record['player']])
+            elapsed += time.perf_counter() - start
+            move = list(move) if move is not None else None
+            allowed = record['best_moves'][:1] if strict else record['best_moves']
+            if move not in allowed:
+                report['move_mismatches'] += 1
+                mismatch(record, 'move', allowed, move)
+        report['moves_checked'] = len(searched)
+        report['moves_per_second'] = len(searched) / elapsed if elapsed else None
+
+    if status_fn is not None:
+        elapsed = 0.0
+        for record, board in zip(corpus, boards):
+            start = time.perf_counter()
+            status = status_fn([row[:] for row in board])
+            elapsed += time.perf_counter() - start
+            actual = {field: status[field] for field in ('game_over', 'winner', 'is_draw')}
+            expected = {'game_over': record['game_over'], 'is_draw': record['is_draw'],
+                        'winner': PLAYER_INTS.get(record['winner'], record['winner'])}
+            if actual != expected:
+                report['status_mismatches'] += 1
+                mismatch(record, 'status', expected, actual)
+        report['statuses_checked'] = len(corpus)
+        report['status_per_second'] = len(corpus) / elapsed if elapsed else None
+
+    return report
+
+
+def _reference_engine() -> Tuple[MoveFn, StatusFn]:
+    ai = SmartTicTacToeAI(difficulty='hard')
+    return (lambda board, player_int: ai._get_optimal_move(board, player_int, -player_int, ai.max_depth),
+            ai.check_game_state)
+
+
+def _parallel_engine() -> Tuple[MoveFn, StatusFn]:
+    ai = SmartTicTacToeAI(difficulty='hard', workers=2)
+    return (lambda board, player_int: ai._get_optimal_move(board, player_int, -player_int, ai.max_depth),
+            ai.check_game_state)
+
+
+def _solver_engine() -> Tuple[MoveFn, StatusFn]:
+    ai = SmartTicTacToeAI(difficulty='hard')
+    env = Environment()
+    cache = {}
+
+    def move_fn(board, player_int):
+        env.board = np.array(board)
+        scored = ai._score_moves(env, player_int, cache)
+        return max(scored, key=lambda item: item[1])[0]
+
+    return move_fn, ai.check_game_state
+
+
+# Engines the check command can run, by name
+ENGINES: Dict[str, Callable[[], Tuple[MoveFn, StatusFn]]] = {
+    'reference': _reference_engine,
+    'parallel': _parallel_engine,
+    'solver': _solver_engine,
+}
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate the position corpus or check an engine against it.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    generate = commands.add_parser('generate', help="write the corpus as JSON lines")
+    generate.add_argument('-o', '--output', help="output file (default: stdout)")
+    check = commands.add_parser('check', help="run an engine over the corpus")
+    check.add_argument('--corpus', help="corpus file (default: generate in memory)")
+    check.add_argument('--engine', choices=sorted(ENGINES), default='reference')
+    check.add_argument('--strict', action='store_true', help="require the reference engine's exact move")
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        records = build_corpus()
+        if args.output:
+            with open(args.output, 'w') as out:
+                write_corpus(records, out)
+        else:
+            write_corpus(records, sys.stdout)
+        print(f"{len(records)} positions", file=sys.stderr)
+        return 0
+
+    if args.corpus:
+        with open(args.corpus) as lines:
+            corpus = load_corpus(lines)
+    else:
+        corpus = build_corpus()
+    move_fn, status_fn = ENGINES[args.engine]()
+    try:
+        report = run_differential(corpus, move_fn, status_fn, strict=args.strict)
+    finally:
+        shutdown_root_pool()
+    print(json.dumps(report, indent=2))
+    return 1 if report['move_mismatches'] or report['status_mismatches'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
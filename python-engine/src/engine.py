@@ -1,7 +1,13 @@
 import os
+from array import array
 import numpy as np
 
-LENGTH = 3 # Board Length, currently supports only 3
+from state_table import LENGTH, NUM_CELLS, POWERS, CELL_TO_DIGIT, LINES
+
+# Line indices passing through each cell
+CELL_LINES = tuple(
+    tuple(n for n, line in enumerate(LINES) if k in line) for k in range(NUM_CELLS)
+)
 
 
 class AgentEval:
@@ -17,35 +23,111 @@ class AgentEval:
         for i in range(LENGTH):
             for j in range(LENGTH):
                 if env.is_empty(i, j):
-                    env.board[i, j] = self.sym
+                    env.play(i, j, self.sym)
                     state = env.get_state()
-                    env.board[i, j] = 0
+                    env.undo(i, j)
                     pos2value[(i, j)] = self.V[state]
                     if self.V[state] > best_value:
                         best_value = self.V[state]
                         best_state = state
                         next_move = (i, j)
-        env.board[next_move[0], next_move[1]] = self.sym
+        env.play(next_move[0], next_move[1], self.sym)
         return next_move
-    
-    
+
+
 class Environment:
+    """
+    Board backed by a flat signed-byte array.
+
+    ``play``/``undo`` keep the base-3 state code and per-line sums up to
+    date incrementally. ``board`` is a writable 3x3 NumPy view of the same
+    memory for callers that index it directly. Writes through it bypass
+    the counters, so once a view has been handed out every public method
+    rebuilds them from the cells first; boards driven only by
+    ``play``/``undo`` keep the incremental fast path.
+    """
+
+    __slots__ = ('_cells', '_state', '_line_sums', '_filled', '_shared',
+                 'x', 'o', 'winner', 'ended', 'num_states')
+
     def __init__(self):
-        self.board = np.zeros((LENGTH, LENGTH))
+        self._cells = array('b', bytes(NUM_CELLS))
+        self._state = 0
+        self._line_sums = [0] * len(LINES)
+        self._filled = 0
+        self._shared = False
         self.x = -1
         self.o = 1
         self.winner = None
         self.ended = False
-        self.num_states = 3 ** (LENGTH * LENGTH)
+        self.num_states = 3 ** NUM_CELLS
+
+    @property
+    def board(self):
+        self._shared = True
+        return np.frombuffer(self._cells, dtype=np.int8).reshape(LENGTH, LENGTH)
+
+    @board.setter
+    def board(self, board):
+        # Raises ValueError for a board without LENGTH x LENGTH cells
+        values = np.reshape(board, (LENGTH, LENGTH)).reshape(-1).tolist()
+        cells = self._cells
+        for k, value in enumerate(values):
+            cells[k] = int(value)
+        self._resync()
+
+    def _resync(self):
+        """Rebuild the state code, line sums and status from the cells."""
+        cells = self._cells
+        self._state = sum(CELL_TO_DIGIT[v] * POWERS[k] for k, v in enumerate(cells))
+        self._line_sums = [sum(cells[k] for k in line) for line in LINES]
+        self._filled = NUM_CELLS - cells.count(0)
+        self._update_status()
+
+    def _update_status(self):
+        sums = self._line_sums
+        if -LENGTH in sums:
+            self.winner = self.x
+        elif LENGTH in sums:
+            self.winner = self.o
+        else:
+            self.winner = None
+        self.ended = self.winner is not None or self._filled == NUM_CELLS
 
     def is_empty(self, i, j):
-        return self.board[i, j] == 0
+        return self._cells[i * LENGTH + j] == 0
+
+    def play(self, i, j, sym):
+        """Place ``sym`` on an empty cell, updating state code and lines."""
+        if self._shared:
+            self._resync()
+        k = i * LENGTH + j
+        self._cells[k] = sym
+        self._state += CELL_TO_DIGIT[sym] * POWERS[k]
+        sums = self._line_sums
+        for n in CELL_LINES[k]:
+            sums[n] += sym
+            if sums[n] == sym * LENGTH:
+                self.winner = sym
+        self._filled += 1
+        self.ended = self.winner is not None or self._filled == NUM_CELLS
+
+    def undo(self, i, j):
+        """Clear a previously played cell."""
+        if self._shared:
+            self._resync()
+        k = i * LENGTH + j
+        sym = self._cells[k]
+        self._cells[k] = 0
+        self._state -= CELL_TO_DIGIT[sym] * POWERS[k]
+        sums = self._line_sums
+        for n in CELL_LINES[k]:
+            sums[n] -= sym
+        self._filled -= 1
+        self._update_status()
 
     def set_state(self, state):
-        self.board = np.reshape(state, (LENGTH, LENGTH))
-        self.game_over()
-        if self.ended:
-          print("Please enter a Non terminal state")
+        self.board = state
 
     def reward(self, sym):
 
@@ -55,63 +137,14 @@ class Environment:
         return 1 if self.winner == sym else 0
 
     def get_state(self):
-
-        k = 0
-        h = 0
-        for i in range(LENGTH):
-            for j in range(LENGTH):
-                if self.board[i, j] == 0:
-                    v = 0
-                elif self.board[i, j] == self.x:
-                    v = 1
-                elif self.board[i, j] == self.o:
-                    v = 2
-                h += (3 ** k) * v
-                k += 1
-        return h
+        if self._shared:
+            self._resync()
+        return self._state
 
     def game_over(self, force_recalculate=False):
-
-        if not force_recalculate and self.ended:
-            return self.ended
-
-        # check rows
-        for i in range(LENGTH):
-            for player in (self.x, self.o):
-                if self.board[i].sum() == player * LENGTH:
-                    self.winner = player
-                    self.ended = True
-                    return True
-
-        # check columns
-        for j in range(LENGTH):
-            for player in (self.x, self.o):
-                if self.board[:, j].sum() == player * LENGTH:
-                    self.winner = player
-                    self.ended = True
-                    return True
-
-        # check diagonals
-        for player in (self.x, self.o):
-            # top-left -> bottom-right diagonal
-            if self.board.trace() == player * LENGTH:
-                self.winner = player
-                self.ended = True
-                return True
-            # top-right -> bottom-left diagonal
-            if np.fliplr(self.board).trace() == player * LENGTH:
-                self.winner = player
-                self.ended = True
-                return True
-
-        if np.all((self.board == 0) == False):
-            # winner stays None
-            self.winner = None
-            self.ended = True
-            return True
-
-        self.winner = None
-        return False
+        if force_recalculate or self._shared:
+            self._resync()
+        return self.ended
 
     def is_draw(self):
-        return self.ended and self.winner is None
+        return self.game_over() and self.winner is None
@@ -0,0 +1,128 @@
+import numpy as np
+from typing import List, Optional
+
+
+def line_indices(board_size: int) -> np.ndarray:
+    """Flat cell indices of every row, column and diagonal, shape (lines, board_size)."""
+    n = board_size
+    lines = [[i * n + j for j in range(n)] for i in range(n)]
+    lines += [[i * n + j for i in range(n)] for j in range(n)]
+    lines.append([i * n + i for i in range(n)])
+    lines.append([i * n + (n - 1 - i) for i in range(n)])
+    return np.array(lines, dtype=np.intp)
+
+
+def default_weights(board_size: int) -> np.ndarray:
+    """
+    Weight table indexed by [own pieces, opponent pieces] in a line.
+
+    Only lines held by one side score: 1, 5, 25, ... for one, two, three
+    pieces, negated for the opponent. On 3x3 this is exactly the old
+    line-by-line _evaluate_position.
+    """
+    weights = np.zeros((board_size + 1, board_size + 1), dtype=np.int64)
+    for count in range(1, board_size):
+        weights[count, 0] = 5 ** (count - 1)
+        weights[0, count] = -weights[count, 0]
+    return weights
+
+
+class PatternEvaluator:
+    """
+    Scores boards from line occupancy counts, one board or a batch at a time.
+
+    The weight table is fixed once constructed; build a new evaluator
+    (or use fit) to change it.
+    """
+
+    def __init__(self, board_size: int = 3, weights: Optional[np.ndarray] = None):
+        self.board_size = board_size
+        self.lines = line_indices(board_size)
+        self.weights = default_weights(board_size) if weights is None else np.asarray(weights)
+        if self.weights.shape != (board_size + 1, board_size + 1):
+            raise ValueError(f"weights must have shape {(board_size + 1, board_size + 1)}")
+        # Plain lists for scoring one board, where NumPy call overhead dominates
+        self._line_list = self.lines.tolist()
+        self._weight_rows = self.weights.tolist()
+
+    def line_counts(self, boards: np.ndarray, player_int: int):
+        """Own and opponent piece counts of every line, each shaped (batch, lines)."""
+        cells = boards[:, self.lines]
+        return (cells == player_int).sum(axis=2), (cells == -player_int).sum(axis=2)
+
+    def evaluate_batch(self, boards: np.ndarray, player_int: int) -> np.ndarray:
+        """
+        Score a batch of non-terminal boards for ``player_int``.
+
+        Args:
+            boards: Flat boards, shape (batch, board_size ** 2)
+            player_int: -1 for X, 1 for O
+        """
+        own, opponent = self.line_counts(boards, player_int)
+        return self.weights[own, opponent].sum(axis=1)
+
+    def evaluate(self, board: List[List[int]], player_int: int) -> float:
+        """Score a single board given as a list of rows."""
+        cells = [cell for row in board for cell in row]
+        weights = self._weight_rows
+        score = 0
+        for line in self._line_list:
+            own = opponent = 0
+            for index in line:
+                cell = cells[index]
+                if cell == player_int:
+                    own += 1
+                elif cell:
+                    opponent += 1
+            score += weights[own][opponent]
+        return score
+
+    def max_score(self) -> float:
+        """Upper bound on the magnitude of any evaluation."""
+        return float(len(self.lines) * np.abs(self.weights).max())
+
+    def features(self, boards: np.ndarray, player_ints: np.ndarray) -> np.ndarray:
+        """
+        Pattern histogram per board, the inputs the weight table is linear in.
+
+        Returns:
+            Array of shape (batch, (board_size + 1) ** 2); column p * (n + 1) + o
+            counts lines with p own and o opponent pieces
+        """
+        size = self.board_size + 1
+        cells = boards[:, self.lines]
+        players = np.asarray(player_ints).reshape(-1, 1, 1)
+        own = (cells == players).sum(axis=2)
+        opponent = (cells == -players).sum(axis=2)
+        patterns = own * size + opponent
+        rows = np.repeat(np.arange(len(boards)), patterns.shape[1])
+        counts = np.zeros((len(boards), size * size))
+        np.add.at(counts, (rows, patterns.ravel()), 1)
+        return counts
+
+    @classmethod
+    def fit(cls, board_size: int, boards: np.ndarray, player_ints: np.ndarray,
+            outcomes: np.ndarray) -> 'PatternEvaluator':
+        """
+        Fit weights to game outcomes by least squares.
+
+        Args:
+            boards: Flat positions from self-play, shape (samples, board_size ** 2)
+            player_ints: Side each position is scored for
+            outcomes: Final result for that side: 1 win, 0 draw, -1 loss
+
+        The fitted table is antisymmetric (w[p, o] == -w[o, p]), so a position
+        scores the same for one side as minus its score for the other.
+        """
+        size = board_size + 1
+        evaluator = cls(board_size)
+        features = evaluator.features(boards, player_ints)
+        pairs = [(p, o) for p in range(size) for o in range(size) if p > o]
+        tied = np.stack([features[:, p * size + o] - features[:, o * size + p] for p, o in pairs], axis=1)
+        coefficients = np.linalg.lstsq(tied, np.asarray(outcomes, dtype=float), rcond=None)[0]
+
+        weights = np.zeros((size, size))
+        for (p, o), value in zip(pairs, coefficients):
+            weights[p, o] = value
+            weights[o, p] = -value
+        return cls(board_size, weights)
@@ -0,0 +1,237 @@
+"""
+Unix domain socket RPC server for a co-located backend.
+
+Every frame is a 4-byte big-endian payload length followed by the payload.
+
+Request payload (8 bytes):
+    u32 request id, u16 state code, u8 player (0=x, 1=o),
+    u8 difficulty (0=easy, 1=medium, 2=hard)
+
+Response payload (12 bytes):
+    u32 request id, u8 status (0=ok, 1=bad request, 2=engine error),
+    i8 row, i8 col (-1, -1 when no move was made), u8 flags (1=game over,
+    2=draw), i8 winner (-1=x, 1=o, 0=none), u8 reserved,
+    u16 state code after the move
+
+Requests on a connection can be pipelined. Responses are written as soon
+as they are ready and carry the request id, so they may arrive out of
+order. Moves come from the same SmartTicTacToeAI code that serves
+/make-move: validation and the cheap opening, win, block and random
+moves are answered in the event loop, and minimax searches run in a
+worker process pool.
+
+Usage:
+    python src/rpc_server.py --socket /tmp/tic-tac-toe-engine.sock [--workers N]
+"""
+import argparse
+import asyncio
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+# Add the current directory to Python path to import engine
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from smart_engine import SmartTicTacToeAI
+from state_table import (
+    NUM_STATES, CELL_TO_DIGIT, POWERS, decode_state, is_legal, can_move, game_status
+)
+
+LENGTH = struct.Struct('>I')
+REQUEST = struct.Struct('>IHBB')
+RESPONSE_FRAME = struct.Struct('>IIBbbBbBH')  # Length prefix plus response payload
+RESPONSE_SIZE = RESPONSE_FRAME.size - LENGTH.size
+
+STATUS_OK = 0
+STATUS_BAD_REQUEST = 1
+STATUS_ENGINE_ERROR = 2
+
+FLAG_GAME_OVER = 1
+FLAG_DRAW = 2
+
+PLAYERS = ('x', 'o')
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+# Requests a single connection may have in flight before reads pause
+MAX_IN_FLIGHT = 1024
+
+# One engine per difficulty in each serving process
+_engines = {}
+
+
+def _status_fields(state_code: int) -> Tuple[int, int]:
+    """Pack the game status of a state into (flags, winner)."""
+    status = game_status(state_code)
+    flags = (FLAG_GAME_OVER if status['game_over'] else 0) | (FLAG_DRAW if status['is_draw'] else 0)
+    return flags, status['winner'] or 0
+
+
+def _engine(difficulty: str) -> SmartTicTacToeAI:
+    ai = _engines.get(difficulty)
+    if ai is None:
+        ai = _engines[difficulty] = SmartTicTacToeAI(difficulty=difficulty)
+    return ai
+
+
+def plan_request(state_code: int, player_code: int,
+                 difficulty_code: int) -> Tuple[Optional[Tuple[int, int, int, int, int, int]], Optional[tuple]]:
+    """
+    Validate a request and run the cheap part of move selection.
+
+    Returns:
+        Tuple of (result, None) when the request is answered, or
+        (None, search arguments) when it needs a minimax search
+    """
+    if player_code >= len(PLAYERS) or difficulty_code >= len(DIFFICULTIES) \
+            or state_code >= NUM_STATES or not is_legal(state_code):
+        return (STATUS_BAD_REQUEST, -1, -1, 0, 0, state_code), None
+
+    flags, winner = _status_fields(state_code)
+    if flags & FLAG_GAME_OVER:
+        return (STATUS_OK, -1, -1, flags, winner, state_code), None
+
+    player_int = -1 if player_code == 0 else 1
+    if not can_move(state_code, player_int):
+        return (STATUS_BAD_REQUEST, -1, -1, 0, 0, state_code), None
+
+    difficulty = DIFFICULTIES[difficulty_code]
+    move = _engine(difficulty).plan_move(decode_state(state_code), PLAYERS[player_code], state_code)
+    if move is None:
+        return None, (state_code, player_int, difficulty)
+    return apply_move(state_code, player_int, move), None
+
+
+def search_move(state_code: int, player_int: int, difficulty: str) -> Tuple[int, int]:
+    """Run the minimax search for a planned request (pool workers call this)."""
+    ai = _engine(difficulty)
+    max_depth = ai.difficulty_settings[difficulty]['max_depth']
+    return ai._get_optimal_move(decode_state(state_code), player_int, -player_int, max_depth)
+
+
+def apply_move(state_code: int, player_int: int, move: Tuple[int, int]) -> Tuple[int, int, int, int, int, int]:
+    """Build the response fields for the engine's move."""
+    row, col = move
+    state_code += CELL_TO_DIGIT[player_int] * POWERS[row * 3 + col]
+    flags, winner = _status_fields(state_code)
+    return STATUS_OK, row, col, flags, winner, state_code
+
+
+def handle_request(state_code: int, player_code: int, difficulty_code: int) -> Tuple[int, int, int, int, int, int]:
+    """
+    Validate a position and play the engine's move in this process.
+
+    Returns:
+        Tuple of (status, row, col, flags, winner, state code after the move)
+    """
+    result, search = plan_request(state_code, player_code, difficulty_code)
+    if search is not None:
+        result = apply_move(search[0], search[1], search_move(*search))
+    return result
+
+
+def _error_result(state_code: int) -> Tuple[int, int, int, int, int, int]:
+    return STATUS_ENGINE_ERROR, -1, -1, 0, 0, state_code
+
+
+def _write_response(writer: asyncio.StreamWriter, request_id: int, result: Tuple[int, int, int, int, int, int]):
+    status, row, col, flags, winner, state_code = result
+    writer.write(RESPONSE_FRAME.pack(RESPONSE_SIZE, request_id, status, row, col, flags, winner, 0, state_code))
+
+
+async def _serve_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                            pool: Optional[ProcessPoolExecutor]):
+    loop = asyncio.get_running_loop()
+    in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+    pending = set()
+
+    async def dispatch(request_id, search):
+        try:
+            move = await loop.run_in_executor(pool, search_move, *search)
+            result = apply_move(search[0], search[1], move)
+        except Exception:
+            result = _error_result(search[0])
+        finally:
+            in_flight.release()
+        _write_response(writer, request_id, result)
+
+    try:
+        while True:
+            (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+            if length != REQUEST.size:
+                break  # Protocol error, drop the connection
+            request_id, state_code, player_code, difficulty_code = REQUEST.unpack(
+                await reader.readexactly(length))
+            # Validation and cheap moves are answered inline; only
+            # minimax searches go to the worker pool
+            try:
+                result, search = plan_request(state_code, player_code, difficulty_code)
+                if search is not None and pool is None:
+                    result = apply_move(search[0], search[1], search_move(*search))
+                    search = None
+            except Exception:
+                result, search = _error_result(state_code), None
+            if search is None:
+                _write_response(writer, request_id, result)
+            else:
+                await in_flight.acquire()
+                task = loop.create_task(dispatch(request_id, search))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        writer.close()
+
+
+async def start_server(path: str, workers: int = 0) -> Tuple[asyncio.AbstractServer, Optional[ProcessPoolExecutor]]:
+    """
+    Start listening on ``path``.
+
+    Args:
+        path: Unix socket path, replaced if it already exists
+        workers: Process pool size for searches; 0 searches in the event loop
+
+    Returns:
+        Tuple of the server and its worker pool (None when workers is 0)
+    """
+    pool = None
+    if workers > 0:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        # Start the workers before any client socket exists, so forked
+        # workers never hold connections open after the server closes them
+        pool.submit(int).result()
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(
+        lambda reader, writer: _serve_connection(reader, writer, pool), path=path)
+    return server, pool
+
+
+async def serve(path: str, workers: int):
+    server, pool = await start_server(path, workers)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Serve the Tic-Tac-Toe engine over a Unix socket.")
+    parser.add_argument('--socket', default='/tmp/tic-tac-toe-engine.sock', help="socket path")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="search worker processes, 0 to search in the event loop")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.socket, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
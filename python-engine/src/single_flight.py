@@ -0,0 +1,37 @@
+import asyncio
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key onto one computation.
+
+    The first caller for a key runs ``fn`` in the event loop's default
+    executor; callers arriving while it is in flight await the same result.
+    The key is released as soon as the computation finishes, so results are
+    never served stale.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {'computed': 0, 'coalesced': 0}
+
+    async def run(self, key: Hashable, fn: Callable[..., Any], *args) -> Any:
+        future = self._in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, fn, *args)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._release(key, done))
+            self.stats['computed'] += 1
+        else:
+            self.stats['coalesced'] += 1
+        # Shield so one cancelled request does not cancel the shared result
+        return await asyncio.shield(future)
+
+    def _release(self, key: Hashable, future: asyncio.Future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
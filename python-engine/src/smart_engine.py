@@ -1,33 +1,109 @@
 import numpy as np
-from typing import Tuple, Optional, List
+from typing import Dict, Tuple, Optional, List
+import multiprocessing
 import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from engine import Environment
+from evaluator import PatternEvaluator
+from state_table import encode_board, game_status, winner_of, CELL_TO_DIGIT, POWERS
+
+# Process pool for root-parallel search, created on first use
+_root_pool = None
+_root_pool_workers = 0
+_root_pool_lock = threading.Lock()
+# Best root score found so far, shared with the pool workers
+_root_alpha = None
+
+def _init_root_worker(shared_alpha):
+    global _root_alpha
+    _root_alpha = shared_alpha
+
+def _search_root_move(board: List[List[int]], move: Tuple[int, int], player_int: int,
+                      opponent_int: int, max_depth: int, difficulty: str, weights=None) -> float:
+    """
+    Score a single root move inside a pool worker.
+    
+    Only unbudgeted searches are split across workers, so the score does
+    not depend on how the root moves were scheduled.
+    """
+    ai = SmartTicTacToeAI(difficulty=difficulty, board_size=len(board),
+                          evaluator=PatternEvaluator(len(board), weights))
+    ai._start_search(max_depth, exact=True)
+    board[move[0]][move[1]] = player_int
+    # Scores are integers, so searching one below the shared bound still
+    # scores moves that tie the best exactly and the pick matches serial search
+    alpha = _root_alpha.value - 1
+    score = ai._minimax(board, 0, False, alpha, float('inf'), player_int, opponent_int, max_depth)
+    with _root_alpha.get_lock():
+        if score > _root_alpha.value:
+            _root_alpha.value = score
+    return score
+
+def _get_root_pool(workers: int) -> ProcessPoolExecutor:
+    """Get the shared root search pool, resizing it if needed."""
+    global _root_pool, _root_pool_workers, _root_alpha
+    if _root_pool is None or _root_pool_workers != workers:
+        if _root_pool is not None:
+            _root_pool.shutdown()
+        _root_alpha = multiprocessing.Value('d', float('-inf'))
+        _root_pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_root_worker,
+                                         initargs=(_root_alpha,))
+        _root_pool_workers = workers
+    return _root_pool
+
+def shutdown_root_pool():
+    """Shut down the root search pool, if one was started."""
+    global _root_pool, _root_pool_workers
+    with _root_pool_lock:
+        if _root_pool is not None:
+            _root_pool.shutdown()
+        _root_pool = None
+        _root_pool_workers = 0
 
 class SmartTicTacToeAI:
-    def __init__(self, difficulty='medium'):
-        self.board_size = 3
-        self.max_depth = 9  # Maximum search depth for minimax
+    def __init__(self, difficulty='medium', workers=1, board_size=3,
+                 evaluator: Optional[PatternEvaluator] = None):
+        self.board_size = board_size  # Boards other than 3x3 skip the state table
+        self.max_depth = board_size * board_size  # Maximum search depth for minimax
         self.winning_combinations = self._get_winning_combinations()
         self.difficulty = difficulty  # 'easy', 'medium', 'hard'
+        self.workers = workers  # Processes used to split root moves, 1 = serial
+        self.evaluator = evaluator or PatternEvaluator(board_size)
+        # Score of a win one ply from the root. On 3x3 this stays on the
+        # exact solver's scale; larger boards need wins above any heuristic
+        self.win_score = 10 if board_size == 3 else int(self.evaluator.max_score()) + self.max_depth + 1
         
         # Difficulty settings
         self.difficulty_settings = {
             'easy': {
                 'optimal_move_chance': 0.3,    # 30% chance to make optimal move
                 'random_move_chance': 0.7,     # 70% chance to make random move
-                'max_depth': 3                 # Limited search depth
+                'max_depth': 3,                # Limited search depth
+                'max_nodes': 300,              # Node budget per search
+                'max_ms': None                 # Optional wall-clock cap per search
             },
             'medium': {
                 'optimal_move_chance': 0.6,    # 60% chance to make optimal move
                 'random_move_chance': 0.4,     # 40% chance to make random move
-                'max_depth': 6                 # Medium search depth
+                'max_depth': 6,                # Medium search depth
+                'max_nodes': 3000,             # Node budget per search
+                'max_ms': None                 # Optional wall-clock cap per search
             },
             'hard': {
                 'optimal_move_chance': 0.9,    # 90% chance to make optimal move
                 'random_move_chance': 0.1,     # 10% chance to make random move
-                'max_depth': 9                 # Full search depth
+                'max_depth': 9,                # Full search depth
+                'max_nodes': None,             # Unlimited, hard always searches fully
+                'max_ms': None                 # Optional wall-clock cap per search
             }
         }
         
+        # Search budget state, reset at the start of every search
+        self.last_search_stats = None
+        self._start_search(self.max_depth)
+        
     def _get_winning_combinations(self) -> List[List[Tuple[int, int]]]:
         """Get all possible winning combinations."""
         combinations = []
@@ -57,6 +133,28 @@ class SmartTicTacToeAI:
         Returns:
             Tuple[int, int]: Best move position (row, col)
         """
+        move = self.plan_move(board, player)
+        if move is None:
+            player_int = -1 if player.lower() == 'x' else 1
+            opponent_int = 1 if player_int == -1 else -1
+            max_depth = self.difficulty_settings[self.difficulty]['max_depth']
+            move = self._get_optimal_move(board, player_int, opponent_int, max_depth)
+        return move
+    
+    def plan_move(self, board: List[List[int]], player: str,
+                  state_code: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        """
+        Apply the cheap, randomized part of move selection.
+        
+        Args:
+            board: 3x3 board (0=empty, -1=X, 1=O)
+            player: 'x' or 'o'
+            state_code: Base-3 code of ``board``, if the caller already has it
+            
+        Returns:
+            The chosen move, or None when the difficulty roll asks for
+            the minimax move, which the caller computes (or shares)
+        """
         # Convert player symbol to integer
         player_int = -1 if player.lower() == 'x' else 1
         opponent_int = 1 if player_int == -1 else -1
@@ -74,43 +172,151 @@ class SmartTicTacToeAI:
         rand = random.random()
         
         # If it's the first move, use opening strategy with some randomness
-        if len(available_moves) == 9:
+        if self.board_size == 3 and len(available_moves) == 9:
             if rand < settings['optimal_move_chance']:
                 return self._get_opening_move()
             else:
                 return random.choice(available_moves)
         
         # If it's the second move and opponent took center, take a corner (with randomness)
-        if len(available_moves) == 8 and board[1][1] != 0:
+        if self.board_size == 3 and len(available_moves) == 8 and board[1][1] != 0:
             corners = [(0, 0), (0, 2), (2, 0), (2, 2)]
             available_corners = [corner for corner in corners if corner in available_moves]
             if available_corners and rand < settings['optimal_move_chance']:
                 return random.choice(available_corners)
         
+        # Win and block checks look up the state code of each reply on 3x3
+        if state_code is None and self.board_size == 3:
+            state_code = encode_board(board)
+        
         # Check for immediate winning moves (always take them regardless of difficulty)
         for move in available_moves:
-            board[move[0]][move[1]] = player_int
-            if self._check_winner(board) == player_int:
-                board[move[0]][move[1]] = 0
+            if self._wins_with(board, state_code, move, player_int):
                 return move
-            board[move[0]][move[1]] = 0
         
         # Check for blocking moves (always block regardless of difficulty)
         for move in available_moves:
-            board[move[0]][move[1]] = opponent_int
-            if self._check_winner(board) == opponent_int:
-                board[move[0]][move[1]] = 0
+            if self._wins_with(board, state_code, move, opponent_int):
                 return move
-            board[move[0]][move[1]] = 0
         
         # Decide between optimal and random move based on difficulty
         if rand < settings['optimal_move_chance']:
-            # Make optimal move using minimax
-            return self._get_optimal_move(board, player_int, opponent_int, settings['max_depth'])
+            # Optimal move using minimax, left to the caller
+            return None
         else:
             # Make random move
             return random.choice(available_moves)
     
+    def _wins_with(self, board: List[List[int]], state_code: Optional[int],
+                   move: Tuple[int, int], player_int: int) -> bool:
+        """Whether playing ``move`` completes a line for player_int, from the state table if coded."""
+        if state_code is not None:
+            digit = CELL_TO_DIGIT[player_int]
+            return winner_of(state_code + digit * POWERS[move[0] * self.board_size + move[1]]) == player_int
+        board[move[0]][move[1]] = player_int
+        won = self._check_winner(board) == player_int
+        board[move[0]][move[1]] = 0
+        return won
+
+    def make_replies(self, board: List[List[int]], player: str,
+                     state_code: Optional[int] = None) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """
+        Choose the engine's reply to every opponent move, one ply ahead.
+
+        Each reply is picked as make_move would pick it, difficulty roll
+        included.
+
+        Args:
+            board: 3x3 board with the opponent to move; used in place and
+                   left as it was passed in
+            player: 'x' or 'o', the side the engine plays
+            state_code: Base-3 code of ``board``, if the caller already has it
+
+        Returns:
+            List of (opponent move, reply) in _get_available_moves order; the
+            reply is (-1, -1) when the opponent's move ends the game
+        """
+        planned = self.plan_replies(board, player, state_code)
+        if any(reply is None for _, reply in planned):
+            searched = self.search_replies(board, player, state_code)
+            planned = [(move, searched[move] if reply is None else reply) for move, reply in planned]
+        return planned
+
+    def plan_replies(self, board: List[List[int]], player: str,
+                     state_code: Optional[int] = None) -> List[Tuple[Tuple[int, int], Optional[Tuple[int, int]]]]:
+        """
+        Apply the difficulty roll to every opponent move, as plan_move does.
+
+        Returns:
+            List of (opponent move, reply) in _get_available_moves order; the
+            reply is (-1, -1) when the opponent's move ends the game, and None
+            when the roll asks for the minimax reply, which search_replies
+            computes
+
+        Raises:
+            ValueError: If the board is not 3x3
+        """
+        if self.board_size != 3:
+            raise ValueError("Reply tables need a 3x3 board")
+        opponent_int = 1 if player.lower() == 'x' else -1
+        if state_code is None:
+            state_code = encode_board(board)
+        planned = []
+        for move in self._get_available_moves(board):
+            code = state_code + CELL_TO_DIGIT[opponent_int] * POWERS[move[0] * self.board_size + move[1]]
+            if game_status(code)['game_over']:
+                planned.append((move, (-1, -1)))
+                continue
+            board[move[0]][move[1]] = opponent_int
+            planned.append((move, self.plan_move(board, player, code)))
+            board[move[0]][move[1]] = 0
+        return planned
+
+    def search_replies(self, board: List[List[int]], player: str,
+                       state_code: Optional[int] = None) -> Dict[Tuple[int, int], Tuple[int, int]]:
+        """
+        Minimax reply to every opponent move that does not end the game.
+
+        Every such move is searched, whatever any roll asked for, so the
+        result depends only on the position and difficulty. When the
+        difficulty searches to full depth without budgets, all siblings
+        share one exact solver cache, which gives the same moves as
+        _get_optimal_move for a fraction of the work.
+
+        Returns:
+            Dict of opponent move to reply; ``board`` is used in place and
+            left as it was passed in
+
+        Raises:
+            ValueError: If the board is not 3x3
+        """
+        if self.board_size != 3:
+            raise ValueError("Reply tables need a 3x3 board")
+        player_int = -1 if player.lower() == 'x' else 1
+        opponent_int = -player_int
+        if state_code is None:
+            state_code = encode_board(board)
+        settings = self.difficulty_settings[self.difficulty]
+        full_depth = settings['max_depth'] >= self.board_size * self.board_size \
+            and settings['max_nodes'] is None and settings['max_ms'] is None
+        env = Environment() if full_depth else None
+        cache = {}
+
+        replies = {}
+        for move in self._get_available_moves(board):
+            code = state_code + CELL_TO_DIGIT[opponent_int] * POWERS[move[0] * self.board_size + move[1]]
+            if game_status(code)['game_over']:
+                continue
+            board[move[0]][move[1]] = opponent_int
+            if full_depth:
+                env.board = board
+                scored = self._score_moves(env, player_int, cache)
+                replies[move] = max(scored, key=lambda item: item[1])[0]
+            else:
+                replies[move] = self._get_optimal_move(board, player_int, opponent_int, settings['max_depth'])
+            board[move[0]][move[1]] = 0
+        return replies
+
     def _get_opening_move(self) -> Tuple[int, int]:
         """Get a strategic opening move."""
         # Prioritize center, then corners, then edges
@@ -136,9 +342,81 @@ class SmartTicTacToeAI:
                     moves.append((i, j))
         return moves
     
-    def _get_optimal_move(self, board: List[List[int]], player_int: int, opponent_int: int, max_depth: int) -> Tuple[int, int]:
-        """Get the optimal move using minimax algorithm."""
+    def _start_search(self, max_depth: int, max_ms: Optional[float] = None, exact: bool = False):
+        """Reset node counters and budgets for a new search, with none if ``exact``."""
+        settings = self.difficulty_settings.get(self.difficulty, {}) if not exact else {}
+        self._node_limit = settings.get('max_nodes')
+        time_limit = settings.get('max_ms') if max_ms is None else max_ms
+        self._time_limit_ms = time_limit
+        self._search_start = time.perf_counter()
+        self._deadline = self._search_start + time_limit / 1000 if time_limit is not None else None
+        self._depth_limit = max_depth
+        self._nodes = 0
+        self._next_clock_check = 64
+        self._depth_reached = 0
+        self._exhausted = None
+    
+    def _finish_search(self) -> dict:
+        """Record how much of each budget the last search used."""
+        self.last_search_stats = {
+            'nodes': self._nodes,
+            'node_limit': self._node_limit,
+            'depth_reached': self._depth_reached,
+            'depth_limit': self._depth_limit,
+            'elapsed_ms': (time.perf_counter() - self._search_start) * 1000,
+            'time_limit_ms': self._time_limit_ms,
+            'budget_exhausted': self._exhausted,  # None, 'nodes' or 'time'
+            'completed': self._exhausted is None,
+            'depth_completed': self._depth_limit if self._exhausted is None else 0
+        }
+        return self.last_search_stats
+    
+    def _budget_exhausted(self) -> bool:
+        """Check the node and wall-clock budgets of the current search."""
+        if self._exhausted is None:
+            if self._node_limit is not None and self._nodes >= self._node_limit:
+                self._exhausted = 'nodes'
+            elif self._deadline is not None and self._nodes >= self._next_clock_check:
+                self._next_clock_check = self._nodes + 64
+                if time.perf_counter() >= self._deadline:
+                    self._exhausted = 'time'
+        return self._exhausted is not None
+    
+    def _get_optimal_move(self, board: List[List[int]], player_int: int, opponent_int: int, max_depth: int,
+                          workers: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Get the optimal move using minimax algorithm.
+        
+        With more than one worker the root moves are split across a process
+        pool. The chosen move is the same as with serial search. Searches
+        with a node or time budget always run serially, since where a shared
+        budget runs out depends on the order the moves are searched in.
+        """
+        return self._search_root(board, player_int, opponent_int, max_depth, workers)[0]
+    
+    def _search_root(self, board: List[List[int]], player_int: int, opponent_int: int, max_depth: int,
+                     workers: Optional[int] = None, max_ms: Optional[float] = None,
+                     exact: bool = False) -> Tuple[Tuple[int, int], float]:
+        """
+        Search all root moves and return the best move with its score.
+        
+        ``max_ms`` overrides the difficulty's wall-clock cap for a serial search.
+        ``exact`` drops the difficulty's node and time budgets.
+        """
         available_moves = self._get_available_moves(board)
+        if workers is None:
+            workers = self.workers
+        settings = self.difficulty_settings.get(self.difficulty, {})
+        budgeted = not exact and (settings.get('max_nodes') is not None
+                                  or settings.get('max_ms') is not None or max_ms is not None)
+        if workers > 1 and len(available_moves) > 1 and not budgeted:
+            scores = self._score_root_moves_parallel(board, available_moves, player_int,
+                                                     opponent_int, max_depth, workers)
+            best_score = max(scores)
+            self.last_search_stats = None  # Budgets are tracked inside the workers
+            return available_moves[scores.index(best_score)], best_score
+        
+        self._start_search(max_depth, max_ms, exact)
         best_move = None
         best_score = float('-inf')
         alpha = float('-inf')
@@ -161,7 +439,79 @@ class SmartTicTacToeAI:
             
             alpha = max(alpha, best_score)
         
-        return best_move
+        self._finish_search()
+        return best_move, best_score
+    
+    def _search_iterative(self, board: List[List[int]], player_int: int, opponent_int: int, max_depth: int,
+                          max_ms: float) -> Tuple[Tuple[int, int], float]:
+        """
+        Iterative deepening search that stops at a wall-clock deadline.
+        
+        Searches depth 1, 2, ... up to max_depth and returns the result of the
+        deepest iteration that finished in time. An iteration cut by the
+        deadline is discarded, unless depth 1 itself was cut, in which case
+        its best move so far is returned. Node budgets apply per iteration,
+        and an iteration that runs out of nodes does not stop the deepening,
+        so the last iteration is the same search _get_optimal_move runs at
+        max_depth. With enough time the move is the one it picks, at every
+        difficulty.
+        """
+        start = time.perf_counter()
+        deadline = start + max_ms / 1000
+        result = None
+        nodes = 0
+        depth_reached = 0
+        depth_completed = 0
+        exhausted = None
+        for depth in range(1, max_depth + 1):
+            remaining_ms = max(0.0, (deadline - time.perf_counter()) * 1000)
+            found = self._search_root(board, player_int, opponent_int, depth, workers=1, max_ms=remaining_ms)
+            stats = self.last_search_stats
+            nodes += stats['nodes']
+            depth_reached = max(depth_reached, stats['depth_reached'])
+            exhausted = stats['budget_exhausted']
+            if exhausted == 'time':
+                result = result or found
+                break
+            result = found
+            if exhausted == 'nodes':
+                continue  # The deeper search gets a fresh node budget, as a plain search would
+            depth_completed = depth
+            if stats['depth_reached'] < depth:
+                break  # No line reached the depth limit, deeper searches would repeat this one
+        
+        self.last_search_stats = {
+            'nodes': nodes,
+            'node_limit': self._node_limit,
+            'depth_reached': depth_reached,
+            'depth_limit': max_depth,
+            'elapsed_ms': (time.perf_counter() - start) * 1000,
+            'time_limit_ms': max_ms,
+            'budget_exhausted': exhausted,
+            'completed': exhausted is None,
+            'depth_completed': depth_completed
+        }
+        return result
+    
+    def _score_root_moves_parallel(self, board: List[List[int]], moves: List[Tuple[int, int]],
+                                   player_int: int, opponent_int: int, max_depth: int,
+                                   workers: int) -> List[float]:
+        """
+        Score root moves in parallel, sharing the best score as alpha.
+        
+        Moves that fail low return a bound strictly below the best score,
+        so the first move with the maximum score is the serial choice.
+        """
+        with _root_pool_lock:
+            pool = _get_root_pool(workers)
+            _root_alpha.value = float('-inf')
+            futures = [
+                pool.submit(_search_root_move, [row[:] for row in board], move,
+                            player_int, opponent_int, max_depth, self.difficulty,
+                            self.evaluator.weights)
+                for move in moves
+            ]
+            return [future.result() for future in futures]
     
     def _minimax(self, board: List[List[int]], depth: int, is_maximizing: bool, 
                  alpha: float, beta: float, player_int: int, opponent_int: int, max_depth: int = None) -> float:
@@ -176,17 +526,22 @@ class SmartTicTacToeAI:
             beta: Beta value for pruning
             player_int: Integer representation of the AI player
             opponent_int: Integer representation of the opponent
+            max_depth: Depth at which positions are scored heuristically
             
         Returns:
             float: Best score for this position
         """
+        self._nodes += 1
+        if depth > self._depth_reached:
+            self._depth_reached = depth
+        
         # Check for terminal states
         winner = self._check_winner(board)
         if winner is not None:
             if winner == player_int:
-                return 10 - depth  # Win (prefer faster wins)
+                return self.win_score - depth  # Win (prefer faster wins)
             elif winner == opponent_int:
-                return depth - 10  # Loss (prefer slower losses)
+                return depth - self.win_score  # Loss (prefer slower losses)
             else:
                 return 0  # Draw
         
@@ -198,15 +553,19 @@ class SmartTicTacToeAI:
         if max_depth is None:
             max_depth = self.max_depth
             
-        # Limit search depth to prevent excessive computation
-        if depth >= max_depth:
+        # Limit search depth and size to prevent excessive computation
+        if depth >= max_depth or self._budget_exhausted():
             return self._evaluate_position(board, player_int, opponent_int)
         
+        # Children are all leaves, score them in one batch
+        if depth + 1 >= max_depth:
+            return self._score_frontier(board, depth, is_maximizing, alpha, beta, player_int, opponent_int)
+        
         if is_maximizing:
             max_score = float('-inf')
             for move in self._get_available_moves(board):
                 board[move[0]][move[1]] = player_int
-                score = self._minimax(board, depth + 1, False, alpha, beta, player_int, opponent_int)
+                score = self._minimax(board, depth + 1, False, alpha, beta, player_int, opponent_int, max_depth)
                 board[move[0]][move[1]] = 0
                 max_score = max(max_score, score)
                 alpha = max(alpha, score)
@@ -217,7 +576,7 @@ class SmartTicTacToeAI:
             min_score = float('inf')
             for move in self._get_available_moves(board):
                 board[move[0]][move[1]] = opponent_int
-                score = self._minimax(board, depth + 1, True, alpha, beta, player_int, opponent_int)
+                score = self._minimax(board, depth + 1, True, alpha, beta, player_int, opponent_int, max_depth)
                 board[move[0]][move[1]] = 0
                 min_score = min(min_score, score)
                 beta = min(beta, score)
@@ -244,29 +603,156 @@ class SmartTicTacToeAI:
         Evaluate a non-terminal position.
         This gives a heuristic score for positions that don't have a clear winner.
         """
-        score = 0
+        return self.evaluator.evaluate(board, player_int)
+    
+    def _score_frontier(self, board: List[List[int]], depth: int, is_maximizing: bool,
+                        alpha: float, beta: float, player_int: int, opponent_int: int) -> float:
+        """
+        Score a node one ply above the depth limit from all its children at once.
         
-        # Evaluate each winning combination
-        for combo in self.winning_combinations:
-            values = [board[pos[0]][pos[1]] for pos in combo]
-            player_count = values.count(player_int)
-            opponent_count = values.count(opponent_int)
-            empty_count = values.count(0)
+        Children are terminal or heuristic leaves, so they are all scored in
+        one batch. The running best over them then replays the alpha-beta
+        loop: the value and the node count are those of the children the
+        loop would have visited before its cutoff, so node budgets run out
+        at the same place as with one _minimax call per child.
+        """
+        flat = np.array(board, dtype=np.int8).ravel()
+        empty = np.flatnonzero(flat == 0)
+        children = np.repeat(flat[np.newaxis], len(empty), axis=0)
+        children[np.arange(len(empty)), empty] = player_int if is_maximizing else opponent_int
+        if depth + 1 > self._depth_reached:
+            self._depth_reached = depth + 1
+        
+        own, opponent = self.evaluator.line_counts(children, player_int)
+        scores = self.evaluator.weights[own, opponent].sum(axis=1)
+        # Only the side that just moved can have completed a line
+        won = ((own if is_maximizing else opponent) == self.board_size).any(axis=1)
+        if len(empty) == 1:
+            scores[:] = 0  # The child fills the board
+        win = self.win_score - (depth + 1)
+        scores = np.where(won, win if is_maximizing else -win, scores)
+        if is_maximizing:
+            running = np.maximum.accumulate(scores)
+            cutoff = running >= beta
+        else:
+            running = np.minimum.accumulate(scores)
+            cutoff = running <= alpha
+        visited = int(cutoff.argmax()) + 1 if cutoff.any() else len(empty)
+        self._nodes += visited
+        return running[visited - 1].item()
+    
+    def _solve(self, env: Environment, player_int: int, cache: dict) -> int:
+        """
+        Exact value of a non-terminal position for the side to move.
+        
+        Uses the same scale as a full-depth _minimax search from this
+        position, so values can be shared between positions of a game
+        through ``cache`` (keyed by state code and side to move).
+        """
+        key = (env.get_state(), player_int)
+        value = cache.get(key)
+        if value is None:
+            value = max(score for _, score in self._score_moves(env, player_int, cache))
+            cache[key] = value
+        return value
+    
+    def _score_moves(self, env: Environment, player_int: int, cache: dict) -> List[Tuple[Tuple[int, int], int]]:
+        """Exact score of every legal move, in the same order as _get_available_moves."""
+        scored = []
+        for i in range(self.board_size):
+            for j in range(self.board_size):
+                if not env.is_empty(i, j):
+                    continue
+                env.play(i, j, player_int)
+                if env.winner == player_int:
+                    score = self.win_score  # As _minimax scores a win at depth 0
+                elif env.ended:
+                    score = 0
+                else:
+                    # Negate the opponent's value, one ply further from the result
+                    score = -self._solve(env, -player_int, cache)
+                    score -= (score > 0) - (score < 0)
+                env.undo(i, j)
+                scored.append(((i, j), score))
+        return scored
+    
+    def analyze_game(self, moves: List[Tuple[int, int]], first_player: str = 'x') -> dict:
+        """
+        Evaluate every position of a game with one search cache.
+        
+        Args:
+            moves: Moves in the order they were played
+            first_player: 'x' or 'o', the side that made the first move
             
-            # Score based on potential winning opportunities
-            if opponent_count == 0:  # No opponent pieces in this line
-                if player_count == 2 and empty_count == 1:
-                    score += 5  # Near win
-                elif player_count == 1 and empty_count == 2:
-                    score += 1  # Potential win
+        Returns:
+            dict: Per-move analysis plus the final game state and the
+                  number of positions searched
             
-            if player_count == 0:  # No player pieces in this line
-                if opponent_count == 2 and empty_count == 1:
-                    score -= 5  # Opponent near win
-                elif opponent_count == 1 and empty_count == 2:
-                    score -= 1  # Opponent potential win
+        Raises:
+            ValueError: If a move is off the board, on an occupied cell
+                        or played after the game ended
+        """
+        env = Environment()
+        cache = {}
+        player_int = -1 if first_player.lower() == 'x' else 1
+        analysis = []
+        for ply, move in enumerate(moves):
+            row, col = move
+            if env.ended:
+                raise ValueError(f"Move {ply + 1} was played after the game ended")
+            if not (0 <= row < self.board_size and 0 <= col < self.board_size):
+                raise ValueError(f"Move {ply + 1} is off the board")
+            if not env.is_empty(row, col):
+                raise ValueError(f"Move {ply + 1} is on an occupied cell")
+            
+            scored = self._score_moves(env, player_int, cache)
+            scores = dict(scored)
+            best_move, best_score = max(scored, key=lambda item: item[1])
+            score = scores[(row, col)]
+            analysis.append({
+                'ply': ply + 1,
+                'player': 'x' if player_int == -1 else 'o',
+                'position': (row, col),
+                'score': score,
+                'best_move': best_move,
+                'best_score': best_score,
+                # A blunder throws away a win or a draw, not just a faster win
+                'blunder': (score > 0) - (score < 0) < (best_score > 0) - (best_score < 0)
+            })
+            env.play(row, col, player_int)
+            player_int = -player_int
         
-        return score
+        result = self.check_game_state(env.board.tolist())
+        result['moves'] = analysis
+        result['board'] = env.board.tolist()
+        result['positions_searched'] = len(cache)
+        return result
+    
+    def analyze_position(self, board: List[List[int]], player: str) -> dict:
+        """
+        Evaluate a position with full-depth search and no difficulty randomness
+        or budgets, so the result is the same for every difficulty.
+        
+        Args:
+            board: 3x3 board (0=empty, -1=X, 1=O)
+            player: 'x' or 'o', the side to move
+            
+        Returns:
+            dict: Game state plus best_move and score for the side to move
+                  (both None when the game is already over)
+        """
+        result = self.check_game_state(board)
+        if result['game_over']:
+            result['best_move'] = None
+            result['score'] = None
+            return result
+        
+        player_int = -1 if player.lower() == 'x' else 1
+        opponent_int = 1 if player_int == -1 else -1
+        best_move, score = self._search_root(board, player_int, opponent_int, self.max_depth, exact=True)
+        result['best_move'] = best_move
+        result['score'] = score
+        return result
     
     def check_game_state(self, board: List[List[int]]) -> dict:
         """
@@ -275,14 +761,14 @@ class SmartTicTacToeAI:
         Returns:
             dict: Game state information
         """
+        if self.board_size == 3:
+            return game_status(encode_board(board))
         winner = self._check_winner(board)
-        is_draw = self._is_board_full(board) and winner is None
-        game_over = winner is not None or is_draw
-        
+        full = self._is_board_full(board)
         return {
-            'game_over': game_over,
+            'game_over': winner is not None or full,
             'winner': winner,
-            'is_draw': is_draw
+            'is_draw': winner is None and full
         }
 
 # Global instance
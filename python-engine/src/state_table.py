@@ -0,0 +1,143 @@
+import numpy as np
+from typing import List, Optional
+
+LENGTH = 3  # Board Length, currently supports only 3
+NUM_CELLS = LENGTH * LENGTH
+NUM_STATES = 3 ** NUM_CELLS
+
+X = -1
+O = 1
+
+# Base-3 digit for each cell value, matching Environment.get_state
+CELL_TO_DIGIT = {0: 0, X: 1, O: 2}
+DIGIT_TO_CELL = (0, X, O)
+POWERS = tuple(3 ** k for k in range(NUM_CELLS))
+
+# Flag bits stored per state code
+LEGAL = 1       # Reachable from the empty board with either side starting
+X_TO_MOVE = 2   # Reachable non-terminal position with X on move
+O_TO_MOVE = 4   # Reachable non-terminal position with O on move
+X_WON = 8
+O_WON = 16
+DRAW = 32
+TERMINAL = X_WON | O_WON | DRAW
+
+# Winning lines as flat cell indices, in the same order as
+# SmartTicTacToeAI.winning_combinations (rows, columns, diagonals)
+LINES = (
+    [[i * LENGTH + j for j in range(LENGTH)] for i in range(LENGTH)]
+    + [[i * LENGTH + j for i in range(LENGTH)] for j in range(LENGTH)]
+    + [[i * LENGTH + i for i in range(LENGTH)]]
+    + [[i * LENGTH + (LENGTH - 1 - i) for i in range(LENGTH)]]
+)
+
+
+def encode_board(board: List[List[int]]) -> int:
+    """
+    Encode a 3x3 board as its base-3 state code.
+
+    Raises:
+        ValueError: If a cell is not 0, -1 or 1
+    """
+    code = 0
+    k = 0
+    for row in board:
+        for cell in row:
+            digit = CELL_TO_DIGIT.get(cell)
+            if digit is None:
+                raise ValueError(f"Invalid cell value: {cell}")
+            code += digit * POWERS[k]
+            k += 1
+    return code
+
+
+def decode_state(code: int) -> List[List[int]]:
+    """Decode a base-3 state code back into a 3x3 board."""
+    cells = []
+    for _ in range(NUM_CELLS):
+        cells.append(DIGIT_TO_CELL[code % 3])
+        code //= 3
+    return [cells[i * LENGTH:(i + 1) * LENGTH] for i in range(LENGTH)]
+
+
+def _build_table() -> np.ndarray:
+    """Compute winner, draw and reachability flags for all 3^9 boards."""
+    codes = np.arange(NUM_STATES)
+    digits = (codes[:, None] // np.array(POWERS)) % 3
+
+    # Assign lines in reverse so the first winning line takes precedence,
+    # like SmartTicTacToeAI._check_winner does for impossible double wins
+    winner = np.zeros(NUM_STATES, dtype=np.uint8)
+    for line in reversed(LINES):
+        line_digits = digits[:, line]
+        winner[np.all(line_digits == 1, axis=1)] = X_WON
+        winner[np.all(line_digits == 2, axis=1)] = O_WON
+
+    full = np.all(digits != 0, axis=1)
+    table = winner.copy()
+    table[full & (winner == 0)] |= DRAW
+
+    # Walk the game tree ply by ply from the empty board, once per starter
+    digit_rows = digits.tolist()
+    for starter in (X, O):
+        frontier = {0}
+        mover = starter
+        while frontier:
+            next_frontier = set()
+            to_move = X_TO_MOVE if mover == X else O_TO_MOVE
+            digit = CELL_TO_DIGIT[mover]
+            for code in frontier:
+                table[code] |= LEGAL
+                if table[code] & TERMINAL:
+                    continue
+                table[code] |= to_move
+                row = digit_rows[code]
+                for k in range(NUM_CELLS):
+                    if row[k] == 0:
+                        next_frontier.add(code + digit * POWERS[k])
+            frontier = next_frontier
+            mover = -mover
+
+    return table
+
+
+STATE_TABLE = _build_table()
+# Plain list copy for scalar lookups, avoiding NumPy scalar overhead
+_FLAGS = STATE_TABLE.tolist()
+
+
+def is_legal(code: int) -> bool:
+    """Check whether the state is reachable in a real game."""
+    return bool(_FLAGS[code] & LEGAL)
+
+
+def can_move(code: int, player_int: int) -> bool:
+    """Check whether the given player can be on move in this state."""
+    flag = X_TO_MOVE if player_int == X else O_TO_MOVE
+    return bool(_FLAGS[code] & flag)
+
+
+def winner_of(code: int) -> Optional[int]:
+    """Look up the winner for a state code (-1, 1 or None)."""
+    flags = _FLAGS[code]
+    if flags & X_WON:
+        return X
+    if flags & O_WON:
+        return O
+    return None
+
+
+def game_status(code: int) -> dict:
+    """
+    Look up the game status for a state code.
+
+    Returns:
+        dict: Same shape as SmartTicTacToeAI.check_game_state
+    """
+    winner = winner_of(code)
+    is_draw = bool(_FLAGS[code] & DRAW)
+    return {
+        'game_over': winner is not None or is_draw,
+        'winner': winner,
+        'is_draw': is_draw
+    }
@@ -0,0 +1,290 @@
+"""
+Retrograde win/draw/loss tablebase for NxN boards (built for 4x4).
+
+Positions are indexed like Environment.get_state, extended to N*N cells:
+cell (i, j) is digit i*N + j of the base-3 state code, 0 empty, 1 X, 2 O.
+Swapping the colours of a position swaps who is to move, so only
+positions with X to move are stored and O-to-move lookups swap first.
+That covers games started by either side: X to move with as many pieces
+as O, or one fewer.
+
+The table is solved from full boards back to the empty board, one piece
+count at a time. Each pass scores a whole layer with vectorized NumPy
+over its child positions, split across processes. Positions with a legal
+piece count are solved whether or not play can reach them, which costs
+little and keeps every reachable lookup O(1).
+
+File layout: an 8-byte header (b'TTTB', u8 board size, u8 version,
+u16 reserved) then 2 bits per state code, four codes per byte starting
+at the low bits: 0 not an X-to-move position, 1 loss, 2 draw, 3 win for
+the side to move.
+
+Usage:
+    python src/tablebase.py -o data/tablebase_4x4.bin [--size 4] [--workers N]
+"""
+import argparse
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Add the current directory to Python path to import engine
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from evaluator import line_indices
+from state_table import CELL_TO_DIGIT
+
+HEADER = struct.Struct('>4sBBH')
+MAGIC = b'TTTB'
+VERSION = 1
+
+UNKNOWN = 0
+LOSS = 1
+DRAW = 2
+WIN = 3
+
+# Game result for the side to move, per stored value
+RESULTS = {LOSS: -1, DRAW: 0, WIN: 1}
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'tablebase_4x4.bin')
+
+# State codes handled per vectorized step, bounds memory use
+CHUNK = 1 << 20
+
+# Per-position metadata: piece count in the low bits plus two flags
+PIECES_MASK = 0x3f
+STORED = 0x40  # X to move with a legal piece count and no X line
+O_LINE = 0x80  # O has completed a line, so X has lost
+
+# Arrays shared with forked solver workers
+_table = None
+_powers = None
+
+
+def _digits(codes: np.ndarray, cells: int) -> np.ndarray:
+    """Base-3 digits of each code, shape (len(codes), cells)."""
+    digits = np.empty((len(codes), cells), dtype=np.int8)
+    rest = codes.copy()
+    for k in range(cells):
+        digits[:, k] = rest % 3
+        rest //= 3
+    return digits
+
+
+def _classify_chunk(args: Tuple[int, int, int]) -> np.ndarray:
+    """Metadata bytes for state codes start..stop-1."""
+    start, stop, board_size = args
+    cells = board_size * board_size
+    lines = line_indices(board_size)
+    digits = _digits(np.arange(start, stop, dtype=np.int64), cells)
+    x_count = (digits == 1).sum(axis=1)
+    o_count = (digits == 2).sum(axis=1)
+    x_line = (digits[:, lines] == 1).all(axis=2).any(axis=1)
+    o_line = (digits[:, lines] == 2).all(axis=2).any(axis=1)
+    stored = ((x_count == o_count) | (x_count + 1 == o_count)) & ~x_line
+    return ((x_count + o_count) | (stored * STORED) | (o_line * O_LINE)).astype(np.uint8)
+
+
+def _map(fn, chunks: list, workers: int) -> list:
+    """Run fn over chunks, in forked processes when there is more than one worker."""
+    if workers > 1 and len(chunks) > 1:
+        # Forked workers read the module arrays as they are now, without copying
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            return pool.map(fn, chunks)
+    return [fn(chunk) for chunk in chunks]
+
+
+def _solve_chunk(args: Tuple[np.ndarray, np.ndarray, int]) -> np.ndarray:
+    """Values of stored positions from their already solved children."""
+    codes, meta, cells = args
+    values = np.zeros(len(codes), dtype=np.uint8)
+    lost = (meta & O_LINE) != 0
+    full = (meta & PIECES_MASK) == cells
+    values[lost] = LOSS
+    values[full & ~lost] = DRAW
+    open_ = ~lost & ~full
+    codes = codes[open_]
+    digits = _digits(codes, cells)
+    # X plays an empty cell and O is to move. The child is stored with
+    # colours swapped: the swapped parent plus an O digit on that cell
+    swapped = ((3 - digits.astype(np.int64)) % 3) @ _powers
+    best = np.zeros(len(codes), dtype=np.uint8)
+    for k in range(cells):
+        empty = digits[:, k] == 0
+        child = _table[swapped[empty] + 2 * _powers[k]]
+        # The child's value is for the opponent, 4 - value negates it
+        best[empty] = np.maximum(best[empty], 4 - child)
+    values[open_] = best
+    return values
+
+
+def build(board_size: int = 4, workers: int = 1, verbose: bool = False) -> np.ndarray:
+    """
+    Solve every stored position.
+
+    Returns:
+        Array of values (UNKNOWN, LOSS, DRAW, WIN) indexed by state code
+    """
+    global _table, _powers
+    cells = board_size * board_size
+    _powers = 3 ** np.arange(cells, dtype=np.int64)
+    start = time.perf_counter()
+    total = 3 ** cells
+    meta = np.concatenate(_map(_classify_chunk, [(i, min(i + CHUNK, total), board_size)
+                                                 for i in range(0, total, CHUNK)], workers))
+    _table = np.zeros(len(meta), dtype=np.uint8)
+    if verbose:
+        print(f"classified {len(meta)} codes in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    for pieces in range(cells, -1, -1):
+        layer = np.flatnonzero((meta & ~np.uint8(O_LINE)) == (pieces | STORED))
+        chunks = [(layer[i:i + CHUNK], meta[layer[i:i + CHUNK]], cells) for i in range(0, len(layer), CHUNK)]
+        # Every child has one more piece, so it was solved by an earlier pass
+        results = _map(_solve_chunk, chunks, workers)
+        for (codes, _, _), values in zip(chunks, results):
+            _table[codes] = values
+        if verbose:
+            print(f"{pieces:>2} pieces: {len(layer):>9} positions, {time.perf_counter() - start:.1f}s",
+                  file=sys.stderr)
+    table, _table = _table, None
+    return table
+
+
+def write(table: np.ndarray, board_size: int, path: str):
+    """Pack a value table at 2 bits per state and write it with its header."""
+    padded = np.zeros((len(table) + 3) // 4 * 4, dtype=np.uint8)
+    padded[:len(table)] = table
+    packed = padded[0::4] | (padded[1::4] << 2) | (padded[2::4] << 4) | (padded[3::4] << 6)
+    with open(path, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, board_size, VERSION, 0))
+        out.write(packed.tobytes())
+
+
+class Tablebase:
+    """Memory-mapped win/draw/loss lookups for perfect play."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        with open(path, 'rb') as f:
+            magic, board_size, version, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} tablebase")
+        self.board_size = board_size
+        self.cells = board_size * board_size
+        self.powers = [3 ** k for k in range(self.cells)]
+        self.lines = line_indices(board_size).tolist()
+        self.cell_lines = [[line for line in self.lines if k in line] for k in range(self.cells)]
+        self.data = np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER.size)
+        if len(self.data) != (3 ** self.cells + 3) // 4:
+            raise ValueError(f"{path} is truncated")
+
+    def encode(self, board: List[List[int]], player_int: int) -> int:
+        """State code of ``board`` seen with X to move (colours swapped for O)."""
+        n = self.board_size
+        code = 0
+        for i in range(n):
+            for j in range(n):
+                cell = board[i][j] * -player_int  # The mover becomes X (-1)
+                code += CELL_TO_DIGIT[cell] * self.powers[i * n + j]
+        return code
+
+    def game_status(self, board: List[List[int]]) -> dict:
+        """Game over, winner (-1, 1 or None) and draw flags, like state_table.game_status."""
+        cells = [cell for row in board for cell in row]
+        winner = None
+        for line in self.lines:
+            first = cells[line[0]]
+            if first and all(cells[k] == first for k in line):
+                winner = first
+                break
+        full = 0 not in cells
+        return {'game_over': winner is not None or full, 'winner': winner,
+                'is_draw': winner is None and full}
+
+    def is_legal(self, board: List[List[int]]) -> bool:
+        """Whether play can reach ``board`` with either side starting, like state_table.is_legal."""
+        cells = [cell for row in board for cell in row]
+        counts = {-1: cells.count(-1), 1: cells.count(1)}
+        if abs(counts[-1] - counts[1]) > 1:
+            return False
+        winners = []
+        for player in (-1, 1):
+            won = [set(line) for line in self.lines if all(cells[k] == player for k in line)]
+            if won:
+                # The winner moved last, and that move completed all its lines
+                if counts[player] < counts[-player] or not set.intersection(*won):
+                    return False
+                winners.append(player)
+        return len(winners) < 2
+
+    def _lookup(self, code: int) -> int:
+        return (int(self.data[code >> 2]) >> ((code & 3) * 2)) & 3
+
+    def value(self, board: List[List[int]], player_int: int) -> Optional[int]:
+        """
+        Game result with perfect play for the side to move.
+
+        Returns:
+            1 win, 0 draw, -1 loss, or None if it cannot be player_int's turn
+        """
+        return RESULTS.get(self._lookup(self.encode(board, player_int)))
+
+    def score_moves(self, board: List[List[int]], player_int: int) -> List[Tuple[Tuple[int, int], int]]:
+        """Result of every legal move for the mover, in row-major order."""
+        n = self.board_size
+        base = self.encode(board, player_int)
+        scored = []
+        for i in range(n):
+            for j in range(n):
+                if board[i][j] != 0:
+                    continue
+                # The opponent is stored as X after the move, so the mover's
+                # pieces, the new one included, become O (digit 2)
+                child = self._swap(base) + 2 * self.powers[i * n + j]
+                scored.append(((i, j), -RESULTS[self._lookup(child)]))
+        return scored
+
+    def best_move(self, board: List[List[int]], player_int: int) -> Optional[Tuple[int, int]]:
+        """
+        First move that keeps the best result, or None on a full board.
+
+        The table does not say how far a win is, so a move that completes a
+        line is taken first; every other winning move keeps the win too.
+        """
+        n = self.board_size
+        scored = self.score_moves(board, player_int)
+        if not scored:
+            return None
+        for (i, j), _ in scored:
+            if any(all(board[k // n][k % n] == player_int for k in line if k != i * n + j)
+                   for line in self.cell_lines[i * n + j]):
+                return (i, j)
+        return max(scored, key=lambda item: item[1])[0]
+
+    def _swap(self, code: int) -> int:
+        swapped = 0
+        for power in self.powers:
+            digit = code % 3
+            code //= 3
+            if digit:
+                swapped += (3 - digit) * power
+        return swapped
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Build a win/draw/loss tablebase.")
+    parser.add_argument('-o', '--output', default=DEFAULT_PATH, help="tablebase file")
+    parser.add_argument('--size', type=int, default=4, help="board size")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help="solver processes")
+    args = parser.parse_args(argv)
+    table = build(args.size, args.workers, verbose=True)
+    write(table, args.size, args.output)
+    counts = np.bincount(table, minlength=4)
+    print(f"wrote {args.output}: {counts[WIN]} wins, {counts[DRAW]} draws, {counts[LOSS]} losses",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import os
 # Add the src directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+import api
 from api import app
 
 client = TestClient(app)
@@ -74,8 +75,8 @@ class TestTicTacToeAPI:
             "current_player": "x"
         }
         response = client.post("/make-move", json=game_state)
-        assert response.status_code == 500  # API returns 500 for validation errors
-        # The API doesn't have proper validation for board size, so it fails with 500
+        assert response.status_code == 400
+        assert "3x3" in response.json()["detail"]
     
     def test_make_move_invalid_player(self):
         """Test making a move with invalid player."""
@@ -84,8 +85,44 @@ class TestTicTacToeAPI:
             "current_player": "invalid"
         }
         response = client.post("/make-move", json=game_state)
-        assert response.status_code == 500  # API returns 500 for validation errors
-        # The API doesn't have proper validation for player, so it fails with 500
+        assert response.status_code == 400
+    
+    def test_make_move_invalid_cell_value(self):
+        """Test making a move with a cell outside {-1, 0, 1}."""
+        game_state = {
+            "board": [[2, 0, 0], [0, 0, 0], [0, 0, 0]],
+            "current_player": "x"
+        }
+        response = client.post("/make-move", json=game_state)
+        assert response.status_code == 400
+    
+    def test_make_move_unreachable_board(self):
+        """Test making a move on a board with impossible piece counts."""
+        game_state = {
+            "board": [[-1, -1, 0], [-1, 0, 0], [0, 0, 0]],
+            "current_player": "o"
+        }
+        response = client.post("/make-move", json=game_state)
+        assert response.status_code == 400
+    
+    def test_make_move_wrong_turn(self):
+        """Test making a move for the player who just moved."""
+        game_state = {
+            "board": [[-1, 0, 0], [0, 0, 0], [0, 0, 0]],
+            "current_player": "x"
+        }
+        response = client.post("/make-move", json=game_state)
+        assert response.status_code == 400
+        assert "turn" in response.json()["detail"]
+    
+    def test_check_game_state_double_win(self):
+        """Test checking a board where both players have a line."""
+        game_state = {
+            "board": [[-1, -1, -1], [1, 1, 1], [0, 0, 0]],
+            "current_player": "x"
+        }
+        response = client.post("/check-game-state", json=game_state)
+        assert response.status_code == 400
     
     def test_make_move_game_over(self):
         """Test making a move when game is already over."""
@@ -142,6 +179,124 @@ class TestTicTacToeAPI:
         assert data["winner"] is None
         assert data["is_draw"] == True
     
+    def test_concurrent_identical_searches_coalesced(self, monkeypatch):
+        """Test that identical concurrent move searches run once."""
+        import asyncio
+        import random
+        from single_flight import SingleFlight
+        monkeypatch.setattr(random, "random", lambda: 0.0)  # Always take the minimax move
+        monkeypatch.setattr(api, "search_flights", SingleFlight())
+        
+        async def scenario():
+            boards = [[[-1, 0, 0], [0, 0, 0], [0, 0, 0]] for _ in range(4)]
+            state_code = api.encode_board(boards[0])
+            return await asyncio.gather(*(api.get_next_action(board, state_code, 'o', 'hard')
+                                          for board in boards))
+        
+        results = asyncio.run(scenario())
+        assert len(set(move for move, _ in results)) == 1
+        assert api.search_flights.stats == {'computed': 1, 'coalesced': 3}
+    
+    def test_make_move_reports_search_budget(self, monkeypatch):
+        """Test that a searched move reports its depth and node budgets."""
+        import random
+        monkeypatch.setattr(random, "random", lambda: 0.0)  # Always take the minimax move
+        game_state = {
+            "board": [[-1, 0, 0], [0, 0, 0], [0, 0, 0]],
+            "current_player": "o",
+            "difficulty": "easy"
+        }
+        response = client.post("/make-move", json=game_state)
+        assert response.status_code == 200
+        search = response.json()["search"]
+        assert search["depth_limit"] == 3
+        assert search["depth_reached"] <= 3
+        assert search["nodes"] > 0
+        assert search["node_limit"] is not None
+    
+    def test_make_move_anytime_search(self, monkeypatch):
+        """Test that max_ms reports whether the search completed and its depth."""
+        import random
+        monkeypatch.setattr(random, "random", lambda: 0.0)  # Always take the minimax move
+        game_state = {
+            "board": [[-1, 0, 0], [0, 1, 0], [0, 0, -1]],
+            "current_player": "o",
+            "difficulty": "hard",
+            "max_ms": 60000
+        }
+        response = client.post("/make-move", json=game_state)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["position"] in ([0, 1], [1, 0], [1, 2], [2, 1])  # Only edges hold the draw
+        assert data["search"]["completed"] == True
+        assert data["search"]["time_limit_ms"] == 60000
+        assert data["search"]["depth_completed"] > 0
+        
+        game_state["max_ms"] = 0
+        search = client.post("/make-move", json=game_state).json()["search"]
+        assert search["completed"] == False
+        assert search["budget_exhausted"] == "time"
+        
+        game_state["max_ms"] = -1
+        assert client.post("/make-move", json=game_state).status_code == 400
+    
+    def test_make_move_includes_replies(self, monkeypatch):
+        """Test that the reply table matches what /make-move later plays."""
+        import random
+        monkeypatch.setattr(random, "random", lambda: 0.0)  # Always take the minimax move
+        game_state = {
+            "board": [[-1, 0, 0], [0, 0, 0], [0, 0, 0]],
+            "current_player": "o",
+            "difficulty": "hard",
+            "include_replies": True
+        }
+        response = client.post("/make-move", json=game_state)
+        assert response.status_code == 200
+        data = response.json()
+        board = data["board"]
+        replies = data["replies"]
+        assert [entry["move"] for entry in replies] == \
+            [[i, j] for i in range(3) for j in range(3) if board[i][j] == 0]
+        for entry in replies:
+            next_board = [row[:] for row in board]
+            next_board[entry["move"][0]][entry["move"][1]] = -1
+            confirmed = client.post("/make-move", json={
+                "board": next_board, "current_player": "o", "difficulty": "hard"
+            }).json()
+            assert confirmed["position"] == entry["reply"]
+            assert confirmed["game_over"] == entry["game_over"]
+            assert confirmed["replies"] is None
+        # Replies could overrun a deadline, so they are skipped under max_ms
+        response = client.post("/make-move", json={**game_state, "max_ms": 1000})
+        assert response.status_code == 200
+        assert response.json()["replies"] is None
+    
+    def test_analyze_game(self):
+        """Test whole-game review with blunder detection."""
+        # X takes the center, O answers on an edge (a losing reply), X wins
+        game_record = {
+            "moves": [[1, 1], [0, 1], [0, 0], [2, 2], [2, 0], [1, 0], [0, 2]],
+            "first_player": "x"
+        }
+        response = client.post("/analyze-game", json=game_record)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["moves"]) == 7
+        assert data["moves"][0]["score"] == 0
+        assert data["moves"][1]["player"] == "o"
+        assert data["moves"][1]["blunder"] == True
+        assert data["moves"][1]["score"] < 0
+        assert data["game_over"] == True
+        assert data["winner"] == "x"
+        assert data["positions_searched"] > 0
+    
+    def test_analyze_game_illegal_move(self):
+        """Test that a move onto an occupied cell is rejected."""
+        game_record = {"moves": [[1, 1], [1, 1]]}
+        response = client.post("/analyze-game", json=game_record)
+        assert response.status_code == 400
+        assert "occupied" in response.json()["detail"]
+    
     def test_set_difficulty(self):
         """Test setting AI difficulty level."""
         response = client.post("/set-difficulty", params={"difficulty": "hard"})
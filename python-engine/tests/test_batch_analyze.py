@@ -0,0 +1,72 @@
+import io
+import json
+import pytest
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from batch_analyze import analyze_stream
+
+class TestBatchAnalyze:
+    """Test cases for the batch analysis CLI."""
+    
+    def run(self, records, **kwargs):
+        lines = [json.dumps(r) if isinstance(r, dict) else r for r in records]
+        out = io.StringIO()
+        stats = analyze_stream(lines, out, **kwargs)
+        return stats, [json.loads(line) for line in out.getvalue().splitlines()]
+    
+    def test_results_in_input_order_and_deduplicated(self):
+        """Test that duplicate positions are searched once and output keeps order."""
+        block = {"board": [[-1, -1, 0], [1, 1, 0], [0, 0, 0]], "current_player": "x", "id": 1}
+        win = {"board": [[-1, -1, -1], [1, 1, 0], [0, 0, 0]], "current_player": "o", "id": 2}
+        stats, results = self.run([block, win, dict(block, id=3)], batch_size=2)
+        assert [r["id"] for r in results] == [1, 2, 3]
+        assert results[0]["best_move"] == [0, 2]
+        assert results[0]["score"] > 0
+        assert results[1]["game_over"] == True
+        assert results[1]["winner"] == "x"
+        assert results[1]["best_move"] is None
+        assert results[2]["best_move"] == results[0]["best_move"]
+        assert stats == {'positions': 3, 'searched': 2, 'errors': 0}
+    
+    def test_invalid_lines_reported(self):
+        """Test that bad input lines get an error instead of stopping the run."""
+        records = [
+            "not json",
+            {"board": [[0, 0], [0, 0]], "current_player": "x"},
+            {"board": [[-1, -1, 0], [0, 0, 0], [0, 0, 0]], "current_player": "o"},
+            {"board": [[-1, 0, 0], [0, 0, 0], [0, 0, 0]], "current_player": "x"},
+        ]
+        stats, results = self.run(records)
+        assert all("error" in r for r in results)
+        assert stats['errors'] == 4
+    
+    def test_input_fields_replaced_once(self):
+        """Test that input fields named like analysis fields are replaced, not duplicated."""
+        record = {"board": [[-1, -1, 0], [1, 1, 0], [0, 0, 0]], "current_player": "x",
+                  "score": "stale", "state": 0, "id": 7}
+        out = io.StringIO()
+        analyze_stream([json.dumps(record)], out)
+        line = out.getvalue()
+        assert line.count('"score"') == 1 and line.count('"state"') == 1
+        result = json.loads(line)
+        assert result["id"] == 7
+        assert result["score"] > 0
+        assert result["state"] != 0
+
+    def test_process_pool_matches_inline(self):
+        """Test that pooled evaluation gives the same results as inline evaluation."""
+        records = [
+            {"board": [[0, 0, 0], [0, -1, 0], [0, 0, 0]], "current_player": "o"},
+            {"board": [[-1, 0, 0], [0, 1, 0], [0, 0, -1]], "current_player": "o"},
+            {"board": [[1, 0, 0], [0, 0, 0], [0, 0, 0]], "current_player": "x"},
+        ]
+        _, inline = self.run(records, workers=1)
+        _, pooled = self.run(records, workers=2)
+        assert pooled == inline
+
+if __name__ == "__main__":
+    pytest.main([__file__])
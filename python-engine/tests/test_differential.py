@@ -0,0 +1,90 @@
+import hashlib
+import io
+import pytest
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from differential import ENGINES, build_corpus, load_corpus, run_differential, write_corpus
+from state_table import NUM_STATES, STATE_TABLE, LEGAL, TERMINAL, X_TO_MOVE, O_TO_MOVE
+
+# Digest of the serialized corpus; changes only if the reference engine's answers do
+CORPUS_SHA256 = 'ca6d4cebea2089be2ab1ca37e3a56be2183aa32132a1bffda174e593ac72bbff'
+
+@pytest.fixture(scope='module')
+def corpus():
+    return build_corpus()
+
+class TestDifferential:
+    """Test cases for the exhaustive position corpus and differential harness."""
+
+    def test_corpus_covers_reachable_positions(self, corpus):
+        """Test that the corpus lists exactly the positions the state table marks legal."""
+        expected = set()
+        for code in range(NUM_STATES):
+            flags = int(STATE_TABLE[code])
+            if flags & TERMINAL and flags & LEGAL:
+                expected.add((code, None))
+            elif flags & LEGAL:
+                if flags & X_TO_MOVE:
+                    expected.add((code, 'x'))
+                if flags & O_TO_MOVE:
+                    expected.add((code, 'o'))
+        assert {(record['state'], record['player']) for record in corpus} == expected
+        assert len(corpus) == 10956
+
+    def test_corpus_is_pinned(self, corpus):
+        """Test that regenerating the corpus gives byte-identical output."""
+        out = io.StringIO()
+        write_corpus(corpus, out)
+        assert hashlib.sha256(out.getvalue().encode()).hexdigest() == CORPUS_SHA256
+
+    def test_corpus_roundtrip(self, corpus):
+        """Test that a written corpus loads back unchanged."""
+        out = io.StringIO()
+        write_corpus(corpus[:100], out)
+        assert load_corpus(out.getvalue().splitlines()) == corpus[:100]
+
+    def test_empty_board_is_a_draw(self, corpus):
+        """Test that every opening move holds the draw for either starter."""
+        for record in corpus[:2]:
+            assert record['state'] == 0
+            assert record['value'] == 0
+            assert len(record['best_moves']) == 9
+
+    def test_reference_engine_matches(self, corpus):
+        """Test that the original minimax search picks the corpus move everywhere."""
+        move_fn, status_fn = ENGINES['reference']()
+        report = run_differential(corpus, move_fn, status_fn, strict=True)
+        assert report['move_mismatches'] == 0
+        assert report['status_mismatches'] == 0
+        assert report['moves_checked'] == 9040
+        assert report['moves_per_second'] > 0
+
+    def test_solver_engine_matches(self, corpus):
+        """Test that the memoised solver picks the reference move everywhere."""
+        move_fn, status_fn = ENGINES['solver']()
+        report = run_differential(corpus, move_fn, status_fn, strict=True)
+        assert report['moves_checked'] == 9040
+        assert report['move_mismatches'] == 0
+        assert report['status_mismatches'] == 0
+
+    def test_mismatches_reported(self, corpus):
+        """Test that a broken engine is caught on both moves and status."""
+        def first_empty(board, player_int):
+            return next((i, j) for i in range(3) for j in range(3) if board[i][j] == 0)
+
+        def never_over(board):
+            return {'game_over': False, 'winner': None, 'is_draw': False}
+
+        report = run_differential(corpus, first_empty, never_over)
+        terminal = sum(record['game_over'] for record in corpus)
+        assert report['move_mismatches'] > 0
+        assert report['status_mismatches'] == terminal
+        assert len(report['mismatches']) == 20
+        assert report['mismatches'][0]['kind'] == 'move'
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -7,7 +7,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from engine import Environment, AgentEval
-from smart_engine import SmartTicTacToeAI
+from smart_engine import SmartTicTacToeAI, shutdown_root_pool
 
 class TestEnvironment:
     """Test cases for the Environment class."""
@@ -29,6 +29,15 @@ class TestEnvironment:
         env.set_state(state)
         assert np.array_equal(env.board, state)
     
+    def test_set_state_rejects_wrong_size(self):
+        """Test that boards without 3x3 cells are rejected, not partly written."""
+        env = Environment()
+        with pytest.raises(ValueError):
+            env.board = np.zeros((4, 4))
+        with pytest.raises(ValueError):
+            env.set_state([[1, 0], [0, -1]])
+        assert env.get_state() == 0
+    
     def test_is_empty(self):
         """Test checking if cell is empty."""
         env = Environment()
@@ -107,6 +116,61 @@ class TestEnvironment:
         assert env.reward(1) == 0
         assert env.reward(-1) == 0
 
+    def test_play_undo_incremental_state(self):
+        """Test that play/undo keep the state code in sync with the board."""
+        env = Environment()
+        moves = [(1, 1, -1), (0, 0, 1), (0, 2, -1), (2, 0, 1)]
+        codes = [env.get_state()]
+        for i, j, sym in moves:
+            env.play(i, j, sym)
+            codes.append(env.get_state())
+            fresh = Environment()
+            fresh.board = env.board.copy()
+            assert env.get_state() == fresh.get_state()
+        for i, j, _ in reversed(moves):
+            env.undo(i, j)
+            codes.pop()
+            assert env.get_state() == codes[-1]
+        assert env.get_state() == 0
+    
+    def test_play_tracks_winner(self):
+        """Test winner tracking through line counters."""
+        env = Environment()
+        for j in range(3):
+            env.play(0, j, -1)
+        assert env.ended == True
+        assert env.winner == -1
+        env.undo(0, 2)
+        assert env.ended == False
+        assert env.winner is None
+
+    def test_writes_through_board_view(self):
+        """Test that in-place writes to the board view are seen by state and status."""
+        env = Environment()
+        view = env.board
+        view[0, 0] = -1
+        assert env.get_state() == 1
+        assert env.game_over() == False
+        view[0, 1] = -1
+        env.play(0, 2, -1)
+        assert env.get_state() == 1 + 3 + 9
+        assert env.game_over() == True
+        assert env.winner == -1
+        view[0, 1] = 1
+        assert env.game_over() == False
+        assert env.get_state() == 1 + 2 * 3 + 9
+
+    def test_agent_eval_take_action(self):
+        """Test AgentEval picks the highest-valued next state."""
+        env = Environment()
+        values = np.zeros(env.num_states)
+        env.play(1, 1, -1)
+        values[env.get_state()] = 1
+        env.undo(1, 1)
+        agent = AgentEval(-1, values)
+        assert agent.take_action(env) == (1, 1)
+        assert env.board[1, 1] == -1
+
 class TestSmartTicTacToeAI:
     """Test cases for the SmartTicTacToeAI class."""
     
@@ -184,6 +248,194 @@ class TestSmartTicTacToeAI:
         expected_moves = [(0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1), (2, 2)]
         assert set(moves) == set(expected_moves)
     
+    def test_parallel_optimal_move_matches_serial(self):
+        """Test that root-parallel search picks the same move as serial search."""
+        ai = SmartTicTacToeAI(difficulty='hard')
+        boards = [
+            [[-1, 0, 0], [0, 0, 0], [0, 0, 0]],
+            [[0, 0, 0], [0, -1, 0], [0, 0, 0]],
+            [[-1, 0, 0], [0, 1, 0], [0, 0, -1]],
+            [[-1, 1, 0], [0, -1, 0], [0, 0, 0]],
+        ]
+        try:
+            for board in boards:
+                for max_depth in (3, 9):
+                    serial = ai._get_optimal_move(board, 1, -1, max_depth)
+                    parallel = ai._get_optimal_move(board, 1, -1, max_depth, workers=2)
+                    assert parallel == serial
+            # Budgeted difficulties fall back to serial search, budget included
+            for difficulty in ('easy', 'medium'):
+                serial_ai = SmartTicTacToeAI(difficulty=difficulty)
+                parallel_ai = SmartTicTacToeAI(difficulty=difficulty, workers=2)
+                for board in [[[0, 0, 0], [0, 0, 0], [0, 0, 0]]] + boards:
+                    serial = serial_ai._get_optimal_move(board, 1, -1, serial_ai.max_depth)
+                    parallel = parallel_ai._get_optimal_move(board, 1, -1, parallel_ai.max_depth)
+                    assert parallel == serial
+                    assert parallel_ai.last_search_stats['nodes'] == serial_ai.last_search_stats['nodes']
+        finally:
+            shutdown_root_pool()
+    
+    def test_depth_limit_applies_to_whole_search(self):
+        """Test that max_depth is honoured below the first ply."""
+        ai = SmartTicTacToeAI(difficulty='hard')
+        board = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+        ai._get_optimal_move(board, -1, 1, 2)
+        assert ai.last_search_stats['depth_reached'] == 2
+        assert ai.last_search_stats['depth_limit'] == 2
+        assert ai.last_search_stats['budget_exhausted'] is None
+    
+    def test_node_budget(self):
+        """Test that the node budget caps the search for cheap difficulties."""
+        ai = SmartTicTacToeAI(difficulty='easy')
+        board = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+        ai._get_optimal_move(board, -1, 1, 3)
+        stats = ai.last_search_stats
+        assert stats['budget_exhausted'] == 'nodes'
+        assert stats['node_limit'] == ai.difficulty_settings['easy']['max_nodes']
+        # Terminal checks may still count a few nodes once the budget is spent
+        assert stats['nodes'] < 2 * stats['node_limit']
+    
+    def test_time_budget(self):
+        """Test that the wall-clock cap stops a full search early."""
+        ai = SmartTicTacToeAI(difficulty='hard')
+        ai.difficulty_settings['hard']['max_ms'] = 0
+        board = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+        move = ai._get_optimal_move(board, -1, 1, 9)
+        assert move in ai._get_available_moves(board)
+        assert ai.last_search_stats['budget_exhausted'] == 'time'
+        assert ai.last_search_stats['nodes'] < 1000
+    
+    def test_iterative_search_matches_full_search(self):
+        """Test that anytime search with time to spare picks the plain search move."""
+        ai = SmartTicTacToeAI(difficulty='hard')
+        boards = [
+            [[0, 0, 0], [0, 0, 0], [0, 0, 0]],
+            [[-1, 0, 0], [0, 1, 0], [0, 0, -1]],
+            [[-1, 1, 0], [0, -1, 0], [0, 0, 0]],
+        ]
+        for board in boards:
+            for max_depth in (2, 9):
+                expected = ai._get_optimal_move(board, 1, -1, max_depth)
+                move, _ = ai._search_iterative(board, 1, -1, max_depth, 60000)
+                assert move == expected
+                stats = ai.last_search_stats
+                assert stats['completed'] == True
+                assert stats['budget_exhausted'] is None
+                assert stats['depth_completed'] <= max_depth
+
+    def test_iterative_search_keeps_budgeted_depth(self):
+        """Test that easy and medium still reach their full depth when an iteration runs out of nodes."""
+        boards = [
+            [[0, 0, 0], [0, 0, 0], [0, 0, 0]],
+            [[-1, 0, 0], [0, 0, 0], [0, 0, 0]],
+            [[0, 0, 0], [0, 1, 0], [0, 0, 0]],
+            [[-1, 0, 0], [0, 1, 0], [0, 0, -1]],
+        ]
+        for difficulty in ('easy', 'medium'):
+            ai = SmartTicTacToeAI(difficulty=difficulty)
+            max_depth = ai.difficulty_settings[difficulty]['max_depth']
+            for board in boards:
+                for player_int in (-1, 1):
+                    expected = ai._get_optimal_move(board, player_int, -player_int, max_depth)
+                    plain = ai.last_search_stats
+                    move, _ = ai._search_iterative(board, player_int, -player_int, max_depth, 60000)
+                    assert move == expected
+                    assert ai.last_search_stats['budget_exhausted'] == plain['budget_exhausted']
+    
+    def test_iterative_search_deadline(self):
+        """Test that anytime search returns a legal move when the deadline hits."""
+        ai = SmartTicTacToeAI(difficulty='hard')
+        board = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+        move, _ = ai._search_iterative(board, -1, 1, 9, 0)
+        assert move in ai._get_available_moves(board)
+        stats = ai.last_search_stats
+        assert stats['completed'] == False
+        assert stats['budget_exhausted'] == 'time'
+        assert stats['depth_completed'] < 9
+        assert board == [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+    
+    def test_analyze_game_matches_full_search(self):
+        """Test that game review scores match a fresh full-depth search."""
+        ai = SmartTicTacToeAI(difficulty='hard')
+        moves = [(0, 0), (1, 1), (2, 2), (0, 2), (2, 0)]
+        result = ai.analyze_game(moves, 'x')
+        board = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+        player_int = -1
+        for move, entry in zip(moves, result['moves']):
+            best_move, best_score = ai._search_root([row[:] for row in board], player_int, -player_int, 9)
+            assert entry['best_move'] == best_move
+            assert entry['best_score'] == best_score
+            board[move[0]][move[1]] = player_int
+            player_int = -player_int
+        assert result['game_over'] == False
+
+    def test_solver_uses_search_win_scale(self):
+        """Test that the exact solver scores wins on the instance's win_score, like _minimax."""
+        ai = SmartTicTacToeAI(difficulty='hard')
+        ai.win_score = 50
+        env = Environment()
+        for board in ([[-1, -1, 0], [1, 1, 0], [0, 0, 0]],
+                      [[-1, 0, 0], [0, 1, 0], [0, 0, -1]],
+                      [[-1, 1, 0], [0, 0, 0], [0, 0, 0]]):
+            player_int = 1 if sum(map(sum, board)) < 0 else -1
+            env.board = np.array(board)
+            scored = ai._score_moves(env, player_int, {})
+            _, best_score = ai._search_root([row[:] for row in board], player_int, -player_int, 9)
+            assert max(score for _, score in scored) == best_score
+
+    def test_analyze_position_ignores_difficulty(self):
+        """Test that position analysis is exact whatever the instance's difficulty."""
+        hard = SmartTicTacToeAI(difficulty='hard')
+        boards = [
+            [[0, 0, 0], [0, 0, 0], [0, 0, 0]],
+            [[-1, 0, 0], [0, 0, 0], [0, 0, 0]],
+            [[-1, 0, 0], [0, 1, 0], [0, 0, -1]],
+        ]
+        for difficulty in ('easy', 'medium'):
+            ai = SmartTicTacToeAI(difficulty=difficulty)
+            for board in boards:
+                player = 'o' if sum(map(sum, board)) < 0 else 'x'
+                assert ai.analyze_position(board, player) == hard.analyze_position(board, player)
+                assert ai.last_search_stats['budget_exhausted'] is None
+        assert hard.analyze_position(boards[0], 'x')['score'] == 0
+
+    def test_make_replies(self, monkeypatch):
+        """Test the one-ply reply table, including opponent moves that end the game."""
+        import random
+        monkeypatch.setattr(random, "random", lambda: 0.0)  # Always take the minimax move
+        ai = SmartTicTacToeAI(difficulty='hard')
+        board = [[-1, -1, 0], [1, 1, 0], [0, 0, 0]]
+        replies = dict(ai.make_replies(board, 'o'))
+        assert board == [[-1, -1, 0], [1, 1, 0], [0, 0, 0]]
+        assert set(replies) == set(ai._get_available_moves(board))
+        assert replies[(0, 2)] == (-1, -1)  # X wins, nothing to answer
+        assert replies[(2, 2)] == (1, 2)  # O completes the middle row
+        for move, reply in replies.items():
+            if reply != (-1, -1):
+                child = [row[:] for row in board]
+                child[move[0]][move[1]] = -1
+                assert reply == ai.make_move(child, 'o')
+
+    def test_plan_replies_rolls_separately_from_search(self, monkeypatch):
+        """Test that the roll is applied per reply and the search covers every reply."""
+        import random
+        ai = SmartTicTacToeAI(difficulty='medium')
+        board = [[-1, 0, 0], [0, 1, 0], [0, 0, 0]]
+        searched = ai.search_replies(board, 'o')
+        assert board == [[-1, 0, 0], [0, 1, 0], [0, 0, 0]]
+        assert set(searched) == set(ai._get_available_moves(board))
+        monkeypatch.setattr(random, "random", lambda: 0.0)
+        planned = ai.plan_replies(board, 'o')
+        assert [move for move, _ in planned] == ai._get_available_moves(board)
+        for move, reply in planned:
+            # Only forced wins and blocks skip the search
+            if reply is not None:
+                child = [row[:] for row in board]
+                child[move[0]][move[1]] = -1
+                assert ai.plan_move(child, 'o') == reply
+        monkeypatch.setattr(random, "random", lambda: 0.99)  # Never take the minimax move
+        assert all(reply is not None for _, reply in ai.plan_replies(board, 'o'))
+
     def test_get_available_moves_full_board(self):
         """Test getting available moves on full board."""
         ai = SmartTicTacToeAI()
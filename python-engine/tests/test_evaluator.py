@@ -0,0 +1,144 @@
+import pytest
+import sys
+import os
+import random
+import numpy as np
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from evaluator import PatternEvaluator, default_weights
+from smart_engine import SmartTicTacToeAI
+
+def random_board(size, rng):
+    cells = [0] * (size * size)
+    for index, cell in enumerate(rng.sample(range(size * size), rng.randrange(size * size))):
+        cells[cell] = -1 if index % 2 == 0 else 1
+    return [cells[i * size:(i + 1) * size] for i in range(size)]
+
+class PerLeafAI(SmartTicTacToeAI):
+    """Search that scores frontier children with one _minimax call each."""
+
+    def _score_frontier(self, board, depth, is_maximizing, alpha, beta, player_int, opponent_int):
+        best = float('-inf') if is_maximizing else float('inf')
+        for i, j in self._get_available_moves(board):
+            board[i][j] = player_int if is_maximizing else opponent_int
+            score = self._minimax(board, depth + 1, not is_maximizing, alpha, beta,
+                                  player_int, opponent_int, depth + 1)
+            board[i][j] = 0
+            if is_maximizing:
+                best = max(best, score)
+                alpha = max(alpha, score)
+            else:
+                best = min(best, score)
+                beta = min(beta, score)
+            if beta <= alpha:
+                break
+        return best
+
+class TestPatternEvaluator:
+    """Test cases for the line pattern evaluator."""
+
+    def test_default_weights_score_lines(self):
+        """Test the 3x3 defaults: 1 and 5 for open lines, negated for the opponent."""
+        evaluator = PatternEvaluator()
+        # X holds the top row twice over and the left column once; O blocks the diagonal
+        board = [[-1, -1, 0], [0, 1, 0], [0, 0, 0]]
+        # Lines for X: row 0 (+5), col 0 (+1), col 1 blocked, diag blocked
+        # Lines for O: row 1 (-1), col 1 blocked, anti-diagonal (-1)
+        assert evaluator.evaluate(board, -1) == 5 + 1 - 1 - 1
+        assert evaluator.evaluate(board, 1) == -(5 + 1 - 1 - 1)
+
+    def test_batch_matches_single(self):
+        """Test that batched and single-board evaluation agree on every board size."""
+        rng = random.Random(0)
+        for size in (3, 4, 5):
+            evaluator = PatternEvaluator(size)
+            boards = [random_board(size, rng) for _ in range(50)]
+            batch = evaluator.evaluate_batch(np.array(boards, dtype=np.int8).reshape(50, -1), 1)
+            assert batch.tolist() == [evaluator.evaluate(board, 1) for board in boards]
+
+    def test_weight_shape_checked(self):
+        """Test that a weight table of the wrong shape is rejected."""
+        with pytest.raises(ValueError):
+            PatternEvaluator(3, default_weights(4))
+
+    def test_fit_recovers_weights(self):
+        """Test that fitting to outcomes generated by a weight table recovers it."""
+        rng = random.Random(1)
+        target = PatternEvaluator(4, default_weights(4) / 10)
+        boards = np.array([random_board(4, rng) for _ in range(500)], dtype=np.int8).reshape(500, -1)
+        players = np.array([rng.choice((-1, 1)) for _ in range(500)])
+        outcomes = np.array([target.evaluate_batch(board[np.newaxis], player)[0]
+                             for board, player in zip(boards, players)])
+        fitted = PatternEvaluator.fit(4, boards, players, outcomes)
+        assert np.allclose(fitted.weights, -fitted.weights.T)
+        assert np.allclose(fitted.evaluate_batch(boards, 1), target.evaluate_batch(boards, 1))
+
+    def test_frontier_matches_per_leaf_search(self):
+        """Test that batched frontier scoring gives the values of a per-leaf search."""
+        rng = random.Random(2)
+        ai = SmartTicTacToeAI(difficulty='hard')
+        checked = 0
+        while checked < 50:
+            board = random_board(3, rng)
+            if ai._check_winner(board) is not None or ai._is_board_full(board):
+                continue
+            for is_maximizing, mover in ((True, -1), (False, 1)):
+                leaves = []
+                for i, j in ai._get_available_moves(board):
+                    board[i][j] = mover
+                    leaves.append(ai._minimax(board, 1, not is_maximizing, float('-inf'),
+                                              float('inf'), -1, 1, 1))
+                    board[i][j] = 0
+                expected = max(leaves) if is_maximizing else min(leaves)
+                assert ai._score_frontier(board, 0, is_maximizing, float('-inf'), float('inf'),
+                                          -1, 1) == expected
+            checked += 1
+
+    def test_frontier_keeps_node_budgets(self):
+        """Test that easy and medium pick the moves and spend the nodes of a per-leaf search."""
+        rng = random.Random(3)
+        checker = SmartTicTacToeAI()
+        boards = []
+        while len(boards) < 40:
+            board = random_board(3, rng)
+            if checker._check_winner(board) is None and not checker._is_board_full(board):
+                boards.append(board)
+        for difficulty in ('easy', 'medium'):
+            ai = SmartTicTacToeAI(difficulty=difficulty)
+            reference = PerLeafAI(difficulty=difficulty)
+            max_depth = ai.difficulty_settings[difficulty]['max_depth']
+            for board in boards:
+                for player_int in (-1, 1):
+                    move = ai._get_optimal_move(board, player_int, -player_int, max_depth)
+                    expected = reference._get_optimal_move(board, player_int, -player_int, max_depth)
+                    assert move == expected
+                    assert ai.last_search_stats['nodes'] == reference.last_search_stats['nodes']
+
+    def test_larger_board_search(self):
+        """Test that search takes a win and blocks a loss on 4x4."""
+        ai = SmartTicTacToeAI(difficulty='hard', board_size=4)
+        board = [[-1, -1, -1, 0], [1, 1, 1, 0], [0, 0, 0, 0], [0, 0, 0, 0]]
+        assert ai._get_optimal_move(board, -1, 1, 2) == (0, 3)
+        board = [[-1, -1, 0, 0], [1, 1, 1, 0], [-1, 0, 0, 0], [0, 0, 0, 0]]
+        assert ai._get_optimal_move(board, -1, 1, 2) == (1, 3)
+
+    def test_larger_board_make_move(self):
+        """Test make_move and check_game_state on 4x4, which the state table does not cover."""
+        for difficulty in ('easy', 'medium'):
+            ai = SmartTicTacToeAI(difficulty=difficulty, board_size=4)
+            board = [[-1, -1, -1, 0], [1, 1, 1, 0], [0, 0, 0, 0], [0, 0, 0, 0]]
+            assert ai.make_move(board, 'x') == (0, 3)
+            assert ai.make_move(board, 'o') == (1, 3)
+            board = [[-1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]]
+            move = ai.make_move(board, 'x')
+            assert board[move[0]][move[1]] == 0
+        assert ai.check_game_state([[-1] * 4, [1, 1, 1, 0], [0] * 4, [0] * 4]) == \
+            {'game_over': True, 'winner': -1, 'is_draw': False}
+        assert ai.check_game_state([[0] * 4] * 4)['game_over'] == False
+        with pytest.raises(ValueError):
+            ai.plan_replies([[0] * 4] * 4, 'x')
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from rpc_server import (
+    LENGTH, REQUEST, RESPONSE_FRAME, STATUS_OK, STATUS_BAD_REQUEST,
+    FLAG_GAME_OVER, start_server, handle_request
+)
+from state_table import encode_board
+
+def rpc_exchange(path, requests, workers):
+    """Pipeline all requests on one connection and return responses by request id."""
+    async def scenario():
+        server, pool = await start_server(path, workers)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            for request in requests:
+                writer.write(LENGTH.pack(REQUEST.size) + REQUEST.pack(*request))
+            await writer.drain()
+            responses = {}
+            for _ in requests:
+                frame = RESPONSE_FRAME.unpack(await reader.readexactly(RESPONSE_FRAME.size))
+                responses[frame[1]] = frame[2:]
+            writer.close()
+            return responses
+        finally:
+            server.close()
+            await server.wait_closed()
+            if pool is not None:
+                pool.shutdown()
+    return asyncio.run(scenario())
+
+class TestRpcServer:
+    """Test cases for the Unix socket RPC server."""
+    
+    def test_handle_request_winning_move(self):
+        """Test that the engine takes an immediate win."""
+        code = encode_board([[-1, -1, 0], [1, 1, 0], [0, 0, 0]])
+        status, row, col, flags, winner, new_code = handle_request(code, 0, 1)
+        assert status == STATUS_OK
+        assert (row, col) == (0, 2)
+        assert flags & FLAG_GAME_OVER
+        assert winner == -1
+        assert new_code == encode_board([[-1, -1, -1], [1, 1, 0], [0, 0, 0]])
+    
+    def test_handle_request_rejects_bad_input(self):
+        """Test that unreachable boards, wrong turns and bad codes are rejected."""
+        assert handle_request(encode_board([[-1, -1, 0], [0, 0, 0], [0, 0, 0]]), 1, 1)[0] == STATUS_BAD_REQUEST
+        assert handle_request(encode_board([[-1, 0, 0], [0, 0, 0], [0, 0, 0]]), 0, 1)[0] == STATUS_BAD_REQUEST
+        assert handle_request(0, 0, 7)[0] == STATUS_BAD_REQUEST
+        assert handle_request(60000, 0, 1)[0] == STATUS_BAD_REQUEST
+    
+    @pytest.mark.parametrize("workers", [0, 1])
+    def test_pipelined_requests(self, tmp_path, workers):
+        """Test several requests in flight on one connection."""
+        requests = [
+            (7, encode_board([[-1, -1, 0], [1, 1, 0], [0, 0, 0]]), 0, 2),
+            (8, encode_board([[-1, -1, -1], [1, 1, 0], [0, 0, 0]]), 1, 1),
+            (9, encode_board([[-1, -1, 0], [0, 0, 0], [0, 0, 0]]), 1, 1),
+            (10, 0, 0, 0),
+        ]
+        responses = rpc_exchange(str(tmp_path / "engine.sock"), requests, workers)
+        assert set(responses) == {7, 8, 9, 10}
+        assert responses[7][:3] == (STATUS_OK, 0, 2)
+        assert responses[8][:3] == (STATUS_OK, -1, -1)
+        assert responses[8][3] & FLAG_GAME_OVER
+        assert responses[9][0] == STATUS_BAD_REQUEST
+        assert responses[10][0] == STATUS_OK
+        assert 0 <= responses[10][1] <= 2 and 0 <= responses[10][2] <= 2
+
+    @pytest.mark.parametrize("workers", [0, 1])
+    def test_searched_move(self, tmp_path, monkeypatch, workers):
+        """Test a request that needs a minimax search, inline and in the pool."""
+        import random
+        from smart_engine import SmartTicTacToeAI
+        monkeypatch.setattr(random, "random", lambda: 0.0)  # Always take the minimax move
+        board = [[-1, 0, 0], [0, 0, 0], [0, 0, 0]]
+        expected = SmartTicTacToeAI(difficulty='hard')._get_optimal_move(board, 1, -1, 9)
+        responses = rpc_exchange(str(tmp_path / "engine.sock"), [(1, encode_board(board), 1, 2)], workers)
+        assert responses[1][:3] == (STATUS_OK,) + expected
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import pytest
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from single_flight import SingleFlight
+
+class TestSingleFlight:
+    """Test cases for single-flight request coalescing."""
+    
+    def test_concurrent_calls_share_one_computation(self):
+        """Test that callers with the same key wait on one computation."""
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+        
+        def compute(value):
+            calls.append(value)
+            release.wait(5)
+            return value * 2
+        
+        async def scenario():
+            tasks = [asyncio.create_task(flights.run('key', compute, 21)) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            assert flights.in_flight() == 1
+            release.set()
+            return await asyncio.gather(*tasks)
+        
+        results = asyncio.run(scenario())
+        assert results == [42] * 5
+        assert calls == [21]
+        assert flights.stats == {'computed': 1, 'coalesced': 4}
+        assert flights.in_flight() == 0
+    
+    def test_different_keys_run_separately(self):
+        """Test that distinct keys are not coalesced."""
+        flights = SingleFlight()
+        
+        async def scenario():
+            return await asyncio.gather(flights.run('a', abs, -1), flights.run('b', abs, -2))
+        
+        assert asyncio.run(scenario()) == [1, 2]
+        assert flights.stats == {'computed': 2, 'coalesced': 0}
+    
+    def test_key_released_after_completion(self):
+        """Test that a finished computation is not reused by later callers."""
+        flights = SingleFlight()
+        counter = iter(range(10))
+        
+        async def scenario():
+            first = await flights.run('key', lambda: next(counter))
+            second = await flights.run('key', lambda: next(counter))
+            return first, second
+        
+        assert asyncio.run(scenario()) == (0, 1)
+    
+    def test_errors_reach_every_waiter(self):
+        """Test that a failed computation raises in all coalesced callers."""
+        flights = SingleFlight()
+        
+        def fail():
+            raise ValueError("boom")
+        
+        async def scenario():
+            return await asyncio.gather(flights.run('key', fail), flights.run('key', fail),
+                                        return_exceptions=True)
+        
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flights.in_flight() == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
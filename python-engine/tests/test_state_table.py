@@ -0,0 +1,70 @@
+import pytest
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from smart_engine import SmartTicTacToeAI
+from state_table import (
+    NUM_STATES, encode_board, decode_state, is_legal, can_move, game_status
+)
+
+class TestStateTable:
+    """Test cases for the precomputed state table."""
+    
+    def test_encode_matches_environment(self):
+        """Test that state codes match Environment.get_state."""
+        import numpy as np
+        from engine import Environment
+        env = Environment()
+        board = [[1, 0, 0], [0, -1, 0], [0, 0, -1]]
+        env.board = np.array(board)
+        assert encode_board(board) == env.get_state()
+    
+    def test_encode_decode_roundtrip(self):
+        """Test that every state code decodes and re-encodes to itself."""
+        for code in range(NUM_STATES):
+            assert encode_board(decode_state(code)) == code
+    
+    def test_encode_invalid_cell(self):
+        """Test that cells outside {-1, 0, 1} are rejected."""
+        with pytest.raises(ValueError):
+            encode_board([[0, 0, 0], [0, 5, 0], [0, 0, 0]])
+    
+    def test_status_matches_reference(self):
+        """Test table status against a line-by-line scan for every board."""
+        ai = SmartTicTacToeAI()
+        for code in range(NUM_STATES):
+            board = decode_state(code)
+            winner = ai._check_winner(board)
+            is_draw = ai._is_board_full(board) and winner is None
+            assert game_status(code) == {
+                'game_over': winner is not None or is_draw,
+                'winner': winner,
+                'is_draw': is_draw
+            }
+    
+    def test_legality(self):
+        """Test reachability for either starting player."""
+        assert is_legal(encode_board([[0, 0, 0], [0, 0, 0], [0, 0, 0]]))
+        assert is_legal(encode_board([[-1, 0, 0], [0, 0, 0], [0, 0, 0]]))
+        assert is_legal(encode_board([[1, 0, 0], [0, 0, 0], [0, 0, 0]]))
+        # Piece counts differ by two
+        assert not is_legal(encode_board([[-1, -1, 0], [0, 0, 0], [0, 0, 0]]))
+        # Both players have a line
+        assert not is_legal(encode_board([[-1, -1, -1], [1, 1, 1], [0, 0, 0]]))
+        # X won but O kept playing
+        assert not is_legal(encode_board([[-1, -1, -1], [1, 1, 0], [1, 1, 0]]))
+    
+    def test_side_to_move(self):
+        """Test side-to-move flags."""
+        empty = encode_board([[0, 0, 0], [0, 0, 0], [0, 0, 0]])
+        assert can_move(empty, -1) and can_move(empty, 1)
+        x_ahead = encode_board([[-1, 0, 0], [0, 0, 0], [0, 0, 0]])
+        assert can_move(x_ahead, 1) and not can_move(x_ahead, -1)
+        x_won = encode_board([[-1, -1, -1], [1, 1, 0], [0, 0, 0]])
+        assert not can_move(x_won, -1) and not can_move(x_won, 1)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
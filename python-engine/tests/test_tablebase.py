@@ -0,0 +1,152 @@
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from differential import build_corpus
+from state_table import NUM_STATES, decode_state, is_legal
+from tablebase import HEADER, LOSS, DRAW, WIN, RESULTS, Tablebase, build, write
+
+def sign(value):
+    return (value > 0) - (value < 0)
+
+# 4x4 positions the API test plays; the fixture solves only these and their descendants
+WIN_4X4 = [[-1, -1, -1, 0], [1, 1, 1, 0], [-1, 1, -1, 1], [1, -1, 0, 0]]
+X_EXTRA_4X4 = [[-1, -1, 0, 1], [1, 1, -1, 0], [-1, 1, -1, 1], [1, -1, -1, 0]]
+
+def solve_subtree(tablebase, board, player_int, table):
+    """Exact result for the side to move, stored in ``table`` like build would."""
+    code = tablebase.encode(board, player_int)
+    if table[code]:
+        return RESULTS[int(table[code])]
+    status = tablebase.game_status(board)
+    if status['game_over']:
+        value = 0 if status['is_draw'] else -1  # Only the previous mover can have won
+    else:
+        value = -1
+        for i, j in [(i, j) for i, row in enumerate(board) for j, cell in enumerate(row) if cell == 0]:
+            board[i][j] = player_int
+            value = max(value, -solve_subtree(tablebase, board, -player_int, table))
+            board[i][j] = 0
+    table[code] = {-1: LOSS, 0: DRAW, 1: WIN}[value]
+    return value
+
+@pytest.fixture(scope='module')
+def tablebase_4x4(tmp_path_factory):
+    """A real 4x4 tablebase file with only the test positions solved, a full build takes too long."""
+    path = str(tmp_path_factory.mktemp('tablebase') / 'tablebase_4x4.bin')
+    table = np.zeros(3 ** 16, dtype=np.uint8)
+    write(table, 4, path)
+    empty = Tablebase(path)
+    solve_subtree(empty, [row[:] for row in WIN_4X4], -1, table)
+    solve_subtree(empty, [row[:] for row in X_EXTRA_4X4], 1, table)
+    write(table, 4, path)
+    return Tablebase(path)
+
+@pytest.fixture(scope='module')
+def tablebase_3x3(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('tablebase') / 'tablebase_3x3.bin')
+    write(build(3), 3, path)
+    return Tablebase(path)
+
+class TestTablebase:
+    """Test cases for the retrograde tablebase, built on 3x3 to keep them fast."""
+
+    def test_matches_exact_solver(self, tablebase_3x3):
+        """Test results and moves against every position of the differential corpus."""
+        for record in build_corpus():
+            if record['game_over']:
+                continue
+            board = decode_state(record['state'])
+            player_int = -1 if record['player'] == 'x' else 1
+            assert tablebase_3x3.value(board, player_int) == sign(record['value'])
+            scores = dict(tablebase_3x3.score_moves(board, player_int))
+            for move in record['best_moves']:
+                assert scores[tuple(move)] == sign(record['value'])
+            assert scores[tablebase_3x3.best_move(board, player_int)] == sign(record['value'])
+
+    def test_symmetric(self, tablebase_3x3):
+        """Test that rotated and mirrored positions have the same value."""
+        for record in build_corpus()[::7]:
+            if record['game_over']:
+                continue
+            board = decode_state(record['state'])
+            player_int = -1 if record['player'] == 'x' else 1
+            value = tablebase_3x3.value(board, player_int)
+            for _ in range(4):
+                board = [list(row) for row in zip(*board[::-1])]
+                assert tablebase_3x3.value(board, player_int) == value
+                assert tablebase_3x3.value(board[::-1], player_int) == value
+
+    def test_takes_immediate_wins(self, tablebase_3x3):
+        """Test that a won position is finished at once, not just kept won."""
+        board = [[-1, 1, 1], [-1, 0, 0], [0, 0, 0]]
+        assert tablebase_3x3.best_move(board, -1) == (2, 0)
+        for record in build_corpus():
+            # A value of 10 means the best moves complete a line
+            if record['value'] == 10:
+                board = decode_state(record['state'])
+                player_int = -1 if record['player'] == 'x' else 1
+                assert list(tablebase_3x3.best_move(board, player_int)) in record['best_moves']
+
+    def test_is_legal_matches_state_table(self, tablebase_3x3):
+        """Test reachability, finished boards included, against the 3x3 state table."""
+        for code in range(NUM_STATES):
+            assert tablebase_3x3.is_legal(decode_state(code)) == is_legal(code)
+
+    def test_wrong_turn(self, tablebase_3x3):
+        """Test that a position where it cannot be the player's turn has no value."""
+        board = [[-1, 0, 0], [0, 0, 0], [0, 0, 0]]
+        assert tablebase_3x3.value(board, 1) == 0
+        assert tablebase_3x3.value(board, -1) is None
+
+    def test_rejects_bad_files(self, tmp_path):
+        """Test that files without the header or with missing data are rejected."""
+        path = tmp_path / 'bad.bin'
+        path.write_bytes(b'not a tablebase')
+        with pytest.raises(ValueError):
+            Tablebase(str(path))
+        path.write_bytes(HEADER.pack(b'TTTB', 3, 1, 0) + b'\0' * 10)
+        with pytest.raises(ValueError):
+            Tablebase(str(path))
+
+    def test_make_move_4x4(self, tablebase_4x4, monkeypatch):
+        """Test that /make-move plays 4x4 boards from the tablebase."""
+        from fastapi.testclient import TestClient
+        import api
+        monkeypatch.setattr(api, 'tablebase_4x4', tablebase_4x4)
+        client = TestClient(api.app)
+        response = client.post("/make-move", json={"board": WIN_4X4, "current_player": "x"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["position"] == [0, 3]
+        assert data["winner"] == "x"
+        # X has an extra piece, so it must be O's turn
+        response = client.post("/make-move", json={"board": X_EXTRA_4X4, "current_player": "x"})
+        assert response.status_code == 400
+        response = client.post("/make-move", json={"board": X_EXTRA_4X4, "current_player": "o"})
+        assert response.status_code == 200
+        assert tuple(response.json()["position"]) == tablebase_4x4.best_move(X_EXTRA_4X4, 1)
+        # Finished boards that play cannot reach: both sides have a line,
+        # or the side with the line did not move last
+        for board in ([[-1, -1, -1, -1], [1, 1, 1, 1], [0, 0, 0, 0], [0, 0, 0, 0]],
+                      [[-1, -1, -1, -1], [1, 1, 1, 0], [1, 1, 0, 0], [0, 0, 0, 0]],
+                      [[-1, -1, -1, -1], [-1, 1, 1, 0], [0, 0, 0, 0], [0, 0, 0, 0]]):
+            response = client.post("/make-move", json={"board": board, "current_player": "x"})
+            assert response.status_code == 400
+
+    def test_make_move_rejects_mismatched_table(self, tablebase_3x3, monkeypatch):
+        """Test that a tablebase for another board size is not used for 4x4 boards."""
+        from fastapi.testclient import TestClient
+        import api
+        monkeypatch.setattr(api, 'tablebase_4x4', tablebase_3x3)
+        client = TestClient(api.app)
+        response = client.post("/make-move", json={"board": WIN_4X4, "current_player": "x"})
+        assert response.status_code == 500
+        assert "3x3" in response.json()["detail"]
+
+if __name__ == "__main__":
+    pytest.main([__file__])